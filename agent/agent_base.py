@@ -3,7 +3,8 @@ import inspect
 
 from agent.parser_agent import ParserAgent
 from agent.query_generator_agent import QueryGeneratorAgent
-from agent.workers.linkedin_search_worker import run_linkedin_search_worker
+from agent.workers.linkedin_search_worker import run_linkedin_search_worker, WORKER_CONCURRENCY
+from agent.pipeline import run_search_enrich_pipeline
 
 
 async def _maybe_call(fn: Callable, *args, **kwargs):
@@ -21,13 +22,20 @@ class BaseAgent:
     Pipeline:
       1) ParserAgent -> dict {"tech_stack":[...], "locations":[...]}
       2) QueryGeneratorAgent.run() -> generates & ENQUEUES queries (MySQL)
-      3) run_linkedin_search_worker -> pulls queued, Serper search, saves, marks done
+      3) run_linkedin_search_worker -> claims this request's queued rows, Serper search, saves, marks done
+         (enrich_inline=True: run_search_enrich_pipeline also enriches each
+          profile via SalesQL as soon as its search finishes)
     """
 
     def __init__(self) -> None:
         pass
 
-    async def run(self, user_input: str, max_results_per_query: int = 20) -> Dict[str, Any]:
+    async def run(
+        self,
+        user_input: str,
+        max_results_per_query: int = 20,
+        enrich_inline: bool = False,
+    ) -> Dict[str, Any]:
         # ---- 1) Instantiate ParserAgent (constructor may or may not take user_input)
         try:
             parser = ParserAgent(user_input)   # if your __init__ needs the text
@@ -56,20 +64,54 @@ class BaseAgent:
         if not isinstance(parsed, dict):
             parsed = {"raw": parsed}
 
-        tech_stack_list: List[str] = parsed.get("tech_stack") or []
+        tech_stack_list: List[str] = [
+            t for t in (parsed.get("tech_stack") or []) if isinstance(t, str) and t.strip()
+        ]
         locations: Optional[List[str]] = parsed.get("locations") or None
 
+        # No recognised technology (or a failed parse): the raw sentence would only
+        # produce junk queries, so enqueue nothing and don't run the worker
+        if "error" in parsed or not tech_stack_list:
+            return {
+                "parsed": parsed,
+                "generated_count": 0,
+                "generated": [],
+                "search_ids": [],
+                "worker_summary": {"processed": [], "failed": []},
+                "error": parsed.get("error") or "No technologies recognised in the request",
+            }
+
         # ---- 3) Query generation (your generator expects a comma string)
-        tech_stack_str = ", ".join(tech_stack_list) if tech_stack_list else user_input
-        qg = QueryGeneratorAgent(tech_stack=tech_stack_str, locations=locations)
-        generated = await qg.run()  # async; returns [{"location": "...", "query": "..."}]
+        qg = QueryGeneratorAgent(tech_stack=", ".join(tech_stack_list), locations=locations)
+        generated = await qg.run()  # async; returns [{"location": "...", "query": "...", "search_id": ...}]
+        # Duplicate requests share queue rows, so several queries may map to one id
+        search_ids = list(dict.fromkeys(g["search_id"] for g in generated if g.get("search_id") is not None))
 
-        # ---- 4) Process queue: search -> save -> mark done
-        summary = await run_linkedin_search_worker(max_results_per_query=max_results_per_query)
+        # ---- 4) Process this request's rows only: search -> save -> mark done (in parallel).
+        # Rows already done (recent identical query) are reported in worker_summary["not_claimed"].
+        if enrich_inline:
+            pipeline = await run_search_enrich_pipeline(
+                max_results_per_query=max_results_per_query,
+                limit=len(search_ids),
+                concurrency=WORKER_CONCURRENCY,
+                search_ids=search_ids,
+            )
+            summary = pipeline["worker_summary"]
+        else:
+            summary = await run_linkedin_search_worker(
+                max_results_per_query=max_results_per_query,
+                limit=len(search_ids),
+                concurrency=WORKER_CONCURRENCY,
+                search_ids=search_ids,
+            )
 
-        return {
+        result = {
             "parsed": parsed,
             "generated_count": len(generated),
             "generated": generated,
+            "search_ids": search_ids,
             "worker_summary": summary,
-        }
\ No newline at end of file
+        }
+        if enrich_inline:
+            result["enrichment_summary"] = pipeline["enrichment_summary"]
+        return result
\ No newline at end of file
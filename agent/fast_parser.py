@@ -0,0 +1,236 @@
+# agent/fast_parser.py
+"""
+Deterministic parser for the common case: known technologies and places.
+
+    fast_parse("Senior Python / Django devs in India")
+    -> ({"tech_stack": ["Python", "Django"], "locations": ["Bangalore", ...]}, 1.0)
+
+The confidence is the share of meaningful words we could explain; ParserAgent
+falls back to the LLM when it is below PARSER_FAST_PATH_MIN_CONFIDENCE. A place
+we don't know ("in Lagos", "in us", "remote") makes it 0, so the request never
+silently falls through to the default locations.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# canonical name -> aliases (matched case-insensitively, longest alias wins)
+TECH_ALIASES: Dict[str, List[str]] = {
+    "Python": ["python", "python3"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi", "fast api"],
+    "Java": ["java", "core java", "j2ee"],
+    "Spring Boot": ["spring boot", "springboot", "spring"],
+    "Kotlin": ["kotlin"],
+    "Scala": ["scala"],
+    "JavaScript": ["javascript", "js", "ecmascript"],
+    "TypeScript": ["typescript", "ts"],
+    "React": ["react", "reactjs", "react.js"],
+    "React Native": ["react native"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue.js": ["vue", "vuejs", "vue.js"],
+    "Next.js": ["next.js", "nextjs"],
+    "Node.js": ["node", "nodejs", "node.js"],
+    "Ruby": ["ruby"],
+    "Ruby on Rails": ["ruby on rails", "rails", "ror"],
+    "Go": ["golang", "go lang", "go developer", "go developers", "go engineer", "go engineers"],
+    "Rust": ["rust"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp", "c sharp"],
+    ".NET": [".net", "dotnet", "asp.net", ".net core"],
+    "PHP": ["php"],
+    "Laravel": ["laravel"],
+    "Elixir": ["elixir"],
+    "Swift": ["swift"],
+    "iOS": ["ios"],
+    "Android": ["android"],
+    "Flutter": ["flutter", "dart"],
+    "SQL": ["sql"],
+    "MySQL": ["mysql"],
+    "PostgreSQL": ["postgresql", "postgres"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Kafka": ["kafka", "apache kafka"],
+    "Apache Spark": ["spark", "apache spark", "pyspark"],
+    "Hadoop": ["hadoop"],
+    "AWS": ["aws", "amazon web services"],
+    "Azure": ["azure"],
+    "GCP": ["gcp", "google cloud"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "DevOps": ["devops", "dev ops", "sre"],
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning"],
+    "Data Science": ["data science", "data scientist", "data scientists"],
+    "Data Engineering": ["data engineering", "data engineer", "data engineers"],
+    "TensorFlow": ["tensorflow"],
+    "PyTorch": ["pytorch"],
+    "Salesforce": ["salesforce"],
+    "SAP": ["sap"],
+    "Power BI": ["power bi", "powerbi"],
+    "Tableau": ["tableau"],
+    "Selenium": ["selenium"],
+    "GraphQL": ["graphql"],
+}
+
+# canonical city -> aliases
+CITY_ALIASES: Dict[str, List[str]] = {
+    "Bangalore": ["bangalore", "bengaluru", "blr"],
+    "Hyderabad": ["hyderabad", "hyd", "secunderabad"],
+    "Pune": ["pune"],
+    "Chennai": ["chennai", "madras"],
+    "Mumbai": ["mumbai", "bombay", "navi mumbai"],
+    "Delhi": ["delhi", "new delhi"],
+    "Gurgaon": ["gurgaon", "gurugram"],
+    "Noida": ["noida", "greater noida"],
+    "Kolkata": ["kolkata", "calcutta"],
+    "Ahmedabad": ["ahmedabad"],
+    "Kochi": ["kochi", "cochin"],
+    "Thiruvananthapuram": ["thiruvananthapuram", "trivandrum"],
+    "Jaipur": ["jaipur"],
+    "Chandigarh": ["chandigarh"],
+    "Indore": ["indore"],
+    "Coimbatore": ["coimbatore"],
+    "San Francisco": ["san francisco", "sf"],
+    "San Jose": ["san jose"],
+    "Seattle": ["seattle"],
+    "New York": ["new york", "nyc", "new york city"],
+    "Boston": ["boston"],
+    "Austin": ["austin"],
+    "Chicago": ["chicago"],
+    "Los Angeles": ["los angeles"],
+    "Toronto": ["toronto"],
+    "Vancouver": ["vancouver"],
+    "London": ["london"],
+    "Manchester": ["manchester"],
+    "Dublin": ["dublin"],
+    "Berlin": ["berlin"],
+    "Munich": ["munich", "münchen"],
+    "Amsterdam": ["amsterdam"],
+    "Paris": ["paris"],
+    "Singapore": ["singapore"],
+    "Dubai": ["dubai"],
+    "Sydney": ["sydney"],
+    "Melbourne": ["melbourne"],
+}
+
+# country / region -> its main tech cities (mirrors the old LLM prompt rule)
+REGION_EXPANSIONS: Dict[str, List[str]] = {
+    "India": ["Bangalore", "Hyderabad", "Pune", "Chennai", "Mumbai",
+              "Delhi", "Gurgaon", "Noida", "Kolkata", "Ahmedabad"],
+    "NCR": ["Delhi", "Gurgaon", "Noida"],
+    "Bay Area": ["San Francisco", "San Jose"],
+    "United States": ["San Francisco", "Seattle", "New York", "Austin", "Boston",
+                      "San Jose", "Chicago", "Los Angeles"],
+    "Canada": ["Toronto", "Vancouver"],
+    "United Kingdom": ["London", "Manchester"],
+    "Germany": ["Berlin", "Munich"],
+    "Australia": ["Sydney", "Melbourne"],
+}
+
+REGION_ALIASES: Dict[str, List[str]] = {
+    "India": ["india", "pan india", "across india"],
+    "NCR": ["ncr", "delhi ncr", "delhi-ncr"],
+    "Bay Area": ["bay area", "silicon valley"],
+    "United States": ["usa", "u.s.", "united states", "america"],
+    "Canada": ["canada"],
+    "United Kingdom": ["uk", "united kingdom", "england", "britain"],
+    "Germany": ["germany"],
+    "Australia": ["australia"],
+}
+
+# Words that carry no search intent in a recruiting request
+STOPWORDS = frozenset("""
+a an the and or of in on at for from to with near around based within across
+find search searching show get give list fetch need needs want looking look hire hiring
+me our we i you please can could would who which that whose having has have know knows
+profile profiles people person candidates candidate talent resumes resume cvs cv
+developer developers dev devs engineer engineers programmer programmers coder coders
+architect architects lead leads manager managers consultant consultants specialist specialists
+expert experts professional professionals freelancer freelancers contractor contractors
+senior sr junior jr mid mid-level level principal staff entry experienced experience
+year years yrs yr plus least skilled skills skill strong good great top best some any all few many
+full stack fullstack full-stack backend back-end frontend front-end software web mobile
+app apps application applications cloud team role roles position positions job jobs opening openings
+onsite hybrid city cities area region location locations linkedin site etc also
+working work worked help helping
+""".split())
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+# "US" is the country; lowercase "us" may be the pronoun, so it is left unexplained
+_US = re.compile(r"\bUS\b")
+# "in <place>", "based in <place>", ...: the word after it should be a place we know
+_LOCATION_CUE = re.compile(r"\b(?:in|at|from|near|around|across|within)\s+(?:the\s+)?([a-z][a-z.\-]*)")
+# Left-over words that name a place we can't expand locally
+_UNKNOWN_PLACES = frozenset({"us", "remote", "remotely"})
+
+
+def _compile(aliases: Dict[str, List[str]]) -> Tuple[re.Pattern, Dict[str, str]]:
+    lookup: Dict[str, str] = {}
+    for canonical, names in aliases.items():
+        for name in names:
+            lookup[name.lower()] = canonical
+    # Longest first so "ruby on rails" beats "ruby"; custom boundaries keep "c++"/".net" intact
+    alternation = "|".join(re.escape(n) for n in sorted(lookup, key=len, reverse=True))
+    pattern = re.compile(rf"(?<![\w+#.])({alternation})(?![\w+#])", re.IGNORECASE)
+    return pattern, lookup
+
+
+@lru_cache(maxsize=1)
+def _matchers():
+    return (
+        _compile(TECH_ALIASES),
+        _compile(CITY_ALIASES),
+        _compile(REGION_ALIASES),
+    )
+
+
+def _add_unique(out: List[str], values: List[str]) -> None:
+    for v in values:
+        if v not in out:
+            out.append(v)
+
+
+def fast_parse(text: str) -> Tuple[Dict[str, List[str]], float]:
+    """
+    Returns ({"tech_stack": [...], "locations": [...]}, confidence in [0, 1]).
+    Confidence is 0 when no technology is recognised or a location could not be.
+    """
+    (tech_re, tech_map), (city_re, city_map), (region_re, region_map) = _matchers()
+    text = text or ""
+    if not text.isupper():
+        text = _US.sub("usa", text)
+    remaining = text.lower()
+    tech_stack: List[str] = []
+    locations: List[str] = []
+    matched_words = 0
+
+    for pattern, lookup, kind in (
+        (region_re, region_map, "region"),
+        (city_re, city_map, "city"),
+        (tech_re, tech_map, "tech"),
+    ):
+        for m in pattern.finditer(remaining):
+            canonical = lookup[m.group(1).lower()]
+            matched_words += len(m.group(1).split())
+            if kind == "tech":
+                _add_unique(tech_stack, [canonical])
+            elif kind == "city":
+                _add_unique(locations, [canonical])
+            else:
+                _add_unique(locations, REGION_EXPANSIONS[canonical])
+        # Blank out what was explained so later passes and the leftover scan skip it
+        remaining = pattern.sub(" ", remaining)
+
+    unknown = [w for w in _WORD.findall(remaining) if w not in STOPWORDS and not w.rstrip("+").isdigit()]
+    unknown_place = any(w in _UNKNOWN_PLACES for w in unknown) or any(
+        w not in STOPWORDS for w in _LOCATION_CUE.findall(remaining)
+    )
+
+    if not tech_stack or unknown_place:
+        confidence = 0.0
+    else:
+        confidence = matched_words / (matched_words + len(unknown))
+    return {"tech_stack": tech_stack, "locations": locations}, confidence
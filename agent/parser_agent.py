@@ -1,15 +1,29 @@
+import ast
+import json
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from agent.fast_parser import fast_parse
+from services.llm_client import (
+    chat_completion,
+    OPENAI_MODEL,
+    llm_cache_key,
+    get_cached_llm_result,
+    set_cached_llm_result,
+)
+
+# Below this share of explained words the request goes to the LLM instead
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("PARSER_FAST_PATH_MIN_CONFIDENCE", "0.8"))
 
 class ParserAgent:
     def __init__(self, user_input: str):
         self.user_input = user_input
 
-    def parse(self) -> dict:
+    async def parse(self) -> dict:
+        # Known technologies and places: answer locally, no LLM round-trip
+        parsed, confidence = fast_parse(self.user_input)
+        if confidence >= FAST_PATH_MIN_CONFIDENCE:
+            return parsed
+
         system_prompt = (
             "You are an AI assistant that extracts structured data from recruitment requests. "
             "Extract two fields: 'tech_stack' (array of technologies) and 'locations' (array of cities or regions). "
@@ -18,15 +32,28 @@ class ParserAgent:
             "{ \"tech_stack\": [\"Ruby\", \"Ruby on Rails\"], \"locations\": [\"Bangalore\", \"Hyderabad\", ...] }"
         )
 
-        response = client.chat.completions.create(model="gpt-4",
-        temperature=0,
-        messages=[
-            { "role": "system", "content": system_prompt },
-            { "role": "user", "content": self.user_input }
-        ])
-
-        content = response.choices[0].message.content
-        try:
-            return eval(content) if isinstance(content, str) else content
-        except Exception:
-            return { "error": "Failed to parse LLM output", "raw": content }
+        # Same model + prompt + (normalized) request -> reuse the earlier parse
+        cache_key = llm_cache_key(OPENAI_MODEL, system_prompt, self.user_input)
+        cached = await get_cached_llm_result(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        content = await chat_completion(
+            model=OPENAI_MODEL,
+            temperature=0,
+            messages=[
+                { "role": "system", "content": system_prompt },
+                { "role": "user", "content": self.user_input }
+            ],
+        )
+
+        # JSON first; Python-literal fallback for single-quoted output (never eval)
+        for loads in (json.loads, ast.literal_eval):
+            try:
+                parsed = loads(content.strip().strip("`").strip())
+            except Exception:
+                continue
+            if isinstance(parsed, dict):
+                await set_cached_llm_result(cache_key, parsed)
+                return parsed
+        return { "error": "Failed to parse LLM output", "raw": content }
@@ -0,0 +1,115 @@
+# agent/pipeline.py
+"""
+Inline search -> enrichment pipeline:
+
+    search worker --(profile per slug)--> bounded asyncio.Queue --> enrich consumers --> BatchWriter
+
+Each query row's results are saved as usual, then every distinct profile goes
+straight onto the queue, so enrichment starts with the first finished search
+instead of after the whole batch. A full queue blocks the search slot that is
+feeding it, and a full BatchWriter blocks the consumers: the slowest stage sets
+the pace. Enriched rows link back to their search via (search_id, linkedin_slug)
+and to the profile's first google_search_results row, as POST /salesql/enrich does.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from agent.tools.query_queue import may_have_saved_results
+from agent.workers.linkedin_search_worker import run_linkedin_search_worker
+from db.salesql_results import get_existing_linkedin_slugs, get_linkedin_urls_for_search_id
+from services.enrichment import Enricher, new_summary
+from services.salesql_client import linkedin_slug
+
+# Profiles waiting between the search and enrichment stages
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "200"))
+# Enrichment consumers; each takes up to PIPELINE_ENRICH_BATCH queued profiles at a time
+PIPELINE_ENRICH_WORKERS = int(os.getenv("PIPELINE_ENRICH_WORKERS", "4"))
+PIPELINE_ENRICH_BATCH = int(os.getenv("PIPELINE_ENRICH_BATCH", "20"))
+
+
+def _take_ready(queue: asyncio.Queue, first: Any, limit: int) -> List[Any]:
+    """`first` plus whatever else is already queued, up to `limit` items."""
+    items = [first]
+    while len(items) < limit:
+        try:
+            items.append(queue.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+    return items
+
+
+async def _consume(queue: asyncio.Queue, enricher: Enricher, batch: int) -> None:
+    while True:
+        items = _take_ready(queue, await queue.get(), batch)
+        try:
+            by_search: Dict[int, List[Dict[str, Any]]] = {}
+            for search_id, candidate in items:
+                by_search.setdefault(search_id, []).append(candidate)
+            for search_id, candidates in by_search.items():
+                await enricher.enrich(search_id, candidates)
+        except Exception as e:
+            print({"pipeline_error": f"enrichment failed: {e}"})
+        finally:
+            for _ in items:
+                queue.task_done()
+
+
+async def run_search_enrich_pipeline(
+    max_results_per_query: int = 20,
+    limit: int = 5,
+    concurrency: int = 1,
+    enrich_workers: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    search_ids: Optional[List[int]] = None,
+) -> Dict[str, Any]:
+    """
+    Claims up to `limit` queued queries (only `search_ids`, if given), searches them `concurrency` requests
+    at a time and enriches every profile found while the searches run.
+    Returns {"worker_summary": ..., "enrichment_summary": ...}; the latter
+    includes seconds from start to the first enriched profile.
+    """
+    started = time.monotonic()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size or PIPELINE_QUEUE_SIZE))
+    summary = new_summary(candidates=0, first_enriched_after_s=None)
+
+    async def _on_saved(row: Dict[str, Any], results: List[dict]) -> None:
+        slugs = list(dict.fromkeys(s for s in (linkedin_slug(r.get("link")) for r in results) if s))
+        if may_have_saved_results(row):
+            # A retried or re-enqueued row may have been enriched already
+            done = await get_existing_linkedin_slugs(row["id"])
+            slugs = [s for s in slugs if s not in done]
+        if not slugs:
+            return
+        # Same candidate shape as POST /salesql/enrich: first google_search_results id per profile
+        first = {r["slug"]: r for r in await get_linkedin_urls_for_search_id(row["id"])}
+        for slug in slugs:
+            candidate = first.get(slug)
+            if candidate is None:
+                continue
+            summary["candidates"] += 1
+            await queue.put((row["id"], candidate))
+
+    async with Enricher(summary) as enricher:
+        consumers = [
+            asyncio.create_task(_consume(queue, enricher, max(1, PIPELINE_ENRICH_BATCH)))
+            for _ in range(max(1, enrich_workers or PIPELINE_ENRICH_WORKERS))
+        ]
+        try:
+            worker_summary = await run_linkedin_search_worker(
+                max_results_per_query=max_results_per_query,
+                limit=limit,
+                concurrency=concurrency,
+                on_saved=_on_saved,
+                search_ids=search_ids,
+            )
+            await queue.join()
+        finally:
+            for task in consumers:
+                task.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+
+    if enricher.first_enriched_at is not None:
+        summary["first_enriched_after_s"] = round(enricher.first_enriched_at - started, 3)
+    return {"worker_summary": worker_summary, "enrichment_summary": summary}
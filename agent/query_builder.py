@@ -0,0 +1,145 @@
+# agent/query_builder.py
+"""
+Builds LinkedIn X-ray queries locally:
+
+    site:linkedin.com/in ("Python developer" OR "Python engineer") Pune
+
+Each tech term expands through the role-synonym table below, merged with the
+optional JSON file at ROLE_SYNONYMS_PATH (written offline by
+scripts/populate_role_synonyms.py). Term lists that would exceed Google's
+limits are split across several queries for the same location.
+"""
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List
+
+ROLE_SYNONYMS_PATH = os.getenv(
+    "ROLE_SYNONYMS_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "role_synonyms.json"),
+)
+
+# Google ignores words past 32; keep OR groups short enough to stay precise
+QUERY_MAX_WORDS = int(os.getenv("QUERY_MAX_WORDS", "32"))
+QUERY_MAX_CHARS = int(os.getenv("QUERY_MAX_CHARS", "2048"))
+QUERY_MAX_OR_TERMS = int(os.getenv("QUERY_MAX_OR_TERMS", "6"))
+
+SITE_PREFIX = "site:linkedin.com/in"
+
+# tech (canonical name from agent/fast_parser.py) -> role titles people put on LinkedIn
+BUILTIN_ROLE_SYNONYMS: Dict[str, List[str]] = {
+    "Python": ["Python developer", "Python engineer"],
+    "Django": ["Django developer"],
+    "Java": ["Java developer", "Java engineer"],
+    "Spring Boot": ["Spring Boot developer"],
+    "JavaScript": ["JavaScript developer"],
+    "TypeScript": ["TypeScript developer"],
+    "React": ["React developer", "React.js developer"],
+    "React Native": ["React Native developer"],
+    "Angular": ["Angular developer"],
+    "Vue.js": ["Vue.js developer"],
+    "Node.js": ["Node.js developer", "Node developer"],
+    "Ruby": ["Ruby developer"],
+    "Ruby on Rails": ["Ruby on Rails developer", "Rails developer"],
+    "Go": ["Golang developer", "Go developer"],
+    "C++": ["C++ developer", "C++ engineer"],
+    "C#": ["C# developer"],
+    ".NET": [".NET developer"],
+    "PHP": ["PHP developer"],
+    "iOS": ["iOS developer", "iOS engineer"],
+    "Android": ["Android developer", "Android engineer"],
+    "Flutter": ["Flutter developer"],
+    "AWS": ["AWS engineer", "AWS cloud engineer"],
+    "DevOps": ["DevOps engineer", "Site Reliability Engineer"],
+    "Kubernetes": ["Kubernetes engineer", "DevOps engineer"],
+    "Machine Learning": ["Machine Learning engineer", "ML engineer"],
+    "Deep Learning": ["Deep Learning engineer"],
+    "Data Science": ["Data Scientist"],
+    "Data Engineering": ["Data Engineer"],
+    "Apache Spark": ["Spark developer", "Big Data engineer"],
+    "Salesforce": ["Salesforce developer"],
+    "SAP": ["SAP consultant"],
+    "Power BI": ["Power BI developer"],
+    "Selenium": ["Selenium automation engineer"],
+}
+
+
+@lru_cache(maxsize=1)
+def load_role_synonyms() -> Dict[str, List[str]]:
+    """Built-in table overlaid with the offline-generated JSON file (lower-cased keys)."""
+    table = {k.lower(): list(v) for k, v in BUILTIN_ROLE_SYNONYMS.items()}
+    try:
+        with open(ROLE_SYNONYMS_PATH, encoding="utf-8") as fh:
+            extra = json.load(fh)
+    except FileNotFoundError:
+        extra = {}
+    except Exception as e:
+        print(f"[QueryBuilder] Ignoring unreadable {ROLE_SYNONYMS_PATH}: {e}")
+        extra = {}
+    for tech, terms in extra.items():
+        if isinstance(terms, list) and terms:
+            table[tech.lower()] = [str(t) for t in terms]
+    return table
+
+
+@lru_cache(maxsize=4096)
+def role_terms(tech: str) -> tuple:
+    """Role titles for one tech; unknown techs get generic developer/engineer titles."""
+    tech = tech.strip()
+    known = load_role_synonyms().get(tech.lower())
+    if known:
+        return tuple(known)
+    return (f"{tech} developer", f"{tech} engineer")
+
+
+def _expand_terms(tech_stack: List[str]) -> List[str]:
+    terms: List[str] = []
+    seen = set()
+    for tech in tech_stack:
+        for term in role_terms(tech):
+            key = term.lower()
+            if key not in seen:
+                seen.add(key)
+                terms.append(term)
+    return terms
+
+
+def _render(terms: List[str], location: str) -> str:
+    group = " OR ".join(f'"{t}"' for t in terms)
+    return f"{SITE_PREFIX} ({group}) {location}".strip()
+
+
+def _word_count(query: str) -> int:
+    return len(query.replace("(", " ").replace(")", " ").replace('"', " ").split())
+
+
+def _fits(terms: List[str], location: str) -> bool:
+    query = _render(terms, location)
+    return (
+        len(terms) <= QUERY_MAX_OR_TERMS
+        and _word_count(query) <= QUERY_MAX_WORDS
+        and len(query) <= QUERY_MAX_CHARS
+    )
+
+
+def build_queries(tech_stack: List[str], locations: List[str]) -> List[dict]:
+    """
+    Cross product of expanded role terms and locations:
+      [{"location": "<Location>", "query": "site:linkedin.com/in (\\"t1\\" OR \\"t2\\") <Location>"}, ...]
+    One location yields several queries when its OR group would break the limits.
+    """
+    terms = _expand_terms(tech_stack)
+    if not terms:
+        return []
+
+    queries: List[dict] = []
+    for location in locations:
+        group: List[str] = []
+        for term in terms:
+            if group and not _fits(group + [term], location):
+                queries.append({"location": location, "query": _render(group, location)})
+                group = []
+            group.append(term)  # a single over-long term still gets its own query
+        if group:
+            queries.append({"location": location, "query": _render(group, location)})
+    return queries
@@ -1,12 +1,6 @@
-import os
-import json
-from openai import OpenAI
-from dotenv import load_dotenv
+from agent.query_builder import build_queries
 from agent.tools.query_queue import enqueue_queries
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 DEFAULT_LOCATIONS = ["Bangalore", "Hyderabad", "Mumbai", "Delhi", "Pune"]
 
 class QueryGeneratorAgent:
@@ -15,42 +9,23 @@ class QueryGeneratorAgent:
         self.locations = locations if locations else DEFAULT_LOCATIONS
 
     async def run(self) -> list[dict]:
-        system_prompt = (
-            "You are a helpful agent that generates Google search queries for finding developer profiles on LinkedIn. "
-            "For each location, return a query in this exact JSON format: "
-            '[{"location":"<Location>","query":"site:linkedin.com/in (\\"term1\\" OR \\"term2\\") <Location>"} , ...]. '
-            "Do not include any explanations, backticks, or extra text—return only valid JSON."
-        )
-
-        user_prompt = (
-            f"Tech Stack: {', '.join(self.tech_stack)}\n"
-            f"Locations: {', '.join(self.locations)}"
-        )
-
-        resp = client.chat.completions.create(
-            model="gpt-4",
-            temperature=0,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-        )
-
-        output = resp.choices[0].message.content or "[]"
-
-        try:
-            queries_data = json.loads(output)
-        except json.JSONDecodeError:
-            # Attempt to clean and parse
-            cleaned = output.strip().strip("```").strip()
-            try:
-                queries_data = json.loads(cleaned)
-            except Exception:
-                return [{"error": "Failed to parse JSON", "raw": output}]
+        """
+        Builds [{"location": ..., "query": ..., "search_id": ...}] from the
+        role-synonym table (agent/query_builder.py) and enqueues the queries;
+        search_id is the queue row each query landed on (possibly an existing
+        one, see enqueue_queries). No LLM call per request;
+        run scripts/populate_role_synonyms.py to teach it new technologies.
+        Returns [] and enqueues nothing when there is no tech stack.
+        """
+        if not self.tech_stack:
+            return []
+        queries_data = build_queries(self.tech_stack, self.locations)
 
         # ✅ Save to DB
         queries = [item["query"] for item in queries_data if "query" in item]
         if queries:
-            await enqueue_queries(queries)
+            search_ids = await enqueue_queries(queries)
+            for item, search_id in zip((i for i in queries_data if "query" in i), search_ids):
+                item["search_id"] = search_id
 
         return queries_data
@@ -1,51 +1,127 @@
 # agent/tools/google_search.py
 
+import asyncio
 import os
-import httpx
+from typing import Any, Dict, List, Optional
+
+from agent.tools.serp_cache import cached_search
+from services.http_clients import get_http_client
+from services.providers import call_provider
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
+# Result pages fetched at the same time (the API serves 10 results per page)
+GOOGLE_CSE_PAGE_CONCURRENCY = int(os.getenv("GOOGLE_CSE_PAGE_CONCURRENCY", "4"))
+
+RESULTS_PER_PAGE = 10
+
+class GoogleSearchError(Exception):
+  def __init__(self, message: str, partial_results: Optional[list[dict]] = None, errors: Optional[list[dict]] = None):
+    super().__init__(message)
+    self.partial_results = partial_results or []
+    self.errors = errors or []
 
-async def google_search(query: str, max_results: int = 100) -> list[dict]:
+async def google_search(query: str, max_results: int = 100, raise_errors: bool = False) -> list[dict]:
   """
   Fetches up to 100 results from Google Custom Search API for a given query.
-  Automatically paginates using 'start' parameter (10 results per request).
+  Pages ('start'=1,11,21,...) are fetched concurrently; see google_search_pages.
+  Complete result sets are cached (see agent/tools/serp_cache.py). If a page
+  fails, the pages before it are returned (not cached, failures logged) unless
+  raise_errors=True.
+  """
+  try:
+    return await cached_search(
+      "google_cse", query, max_results, lambda: _fetch_google(query, max_results)
+    )
+  except GoogleSearchError as e:
+    if raise_errors:
+      raise
+    for err in e.errors:
+      print(f"[Google Search] Page start={err['start']} failed for query='{query}': {err['error']}")
+    print(f"[Google Search] Returning {len(e.partial_results)} partial result(s) for query='{query}'")
+    return e.partial_results
+
+async def _fetch_google(query: str, max_results: int) -> list[dict]:
+  page = await google_search_pages(query, max_results)
+  if page["errors"]:
+    raise GoogleSearchError(
+      f"{len(page['errors'])} page(s) failed for query='{query}'",
+      partial_results=page["results"],
+      errors=page["errors"],
+    )
+  return page["results"]
+
+async def _fetch_page(query: str, start: int) -> list[dict]:
+  params = {
+    "key": GOOGLE_API_KEY,
+    "cx": GOOGLE_CSE_ID,
+    "q": query,
+    "num": RESULTS_PER_PAGE,
+    "start": start
+  }
+
+  async def _get():
+    response = await get_http_client("google_cse").get("/customsearch/v1", params=params)
+    response.raise_for_status()
+    return response
+
+  response = await call_provider("google_cse", _get)
+  return response.json().get("items", []) or []
+
+async def google_search_pages(
+  query: str,
+  max_results: int = 100,
+  concurrency: Optional[int] = None,
+) -> Dict[str, Any]:
   """
+  Fetches result pages `concurrency` at a time and stops after the wave in
+  which a short or empty page marks the end, or in which any page failed
+  (results past a failed page are dropped anyway). Returns
+    {"results": [...in page order, links de-duplicated...],
+     "errors": [{"start": 11, "error": "..."}, ...]}
+  Results stop at the first failed page so callers never get a gap.
+  """
+  concurrency = max(1, concurrency or GOOGLE_CSE_PAGE_CONCURRENCY)
+  starts = list(range(1, max_results + 1, RESULTS_PER_PAGE))
+  pages: Dict[int, Any] = {}
+  last_start: Optional[int] = None  # first short/empty page = end of results
+
+  for i in range(0, len(starts), concurrency):
+    wave = starts[i:i + concurrency]
+    fetched = await asyncio.gather(*(_fetch_page(query, s) for s in wave), return_exceptions=True)
+    wave_failed = False
+    for start, items in zip(wave, fetched):
+      pages[start] = items
+      if isinstance(items, Exception):
+        wave_failed = True
+      elif len(items) < RESULTS_PER_PAGE:
+        last_start = start if last_start is None else min(last_start, start)
+    if last_start is not None or wave_failed:
+      break
+
+  results: List[dict] = []
+  errors: List[dict] = []
+  seen = set()
+  failed = False
+  for start in sorted(pages):
+    if last_start is not None and start > last_start:
+      break  # beyond the end; anything here is noise
+    items = pages[start]
+    if isinstance(items, Exception):
+      errors.append({"start": start, "error": str(items)})
+      failed = True
+      continue
+    if failed:
+      continue
+    for item in items:
+      link = item.get("link")
+      if link in seen:
+        continue
+      seen.add(link)
+      results.append({
+        "title": item.get("title"),
+        "link": link,
+        "snippet": item.get("snippet", "")
+      })
 
-  url = "https://www.googleapis.com/customsearch/v1"
-  results = []
-  results_per_page = 10
-
-  async with httpx.AsyncClient() as client:
-    for start in range(1, max_results + 1, results_per_page):
-      params = {
-        "key": GOOGLE_API_KEY,
-        "cx": GOOGLE_CSE_ID,
-        "q": query,
-        "num": results_per_page,
-        "start": start
-      }
-
-      try:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-      except Exception as e:
-        print(f"[Google Search] Failed at start={start} for query='{query}': {e}")
-        break
-
-      items = data.get("items", [])
-      if not items:
-        break  # No more results
-
-      for item in items:
-        results.append({
-          "title": item.get("title"),
-          "link": item.get("link"),
-          "snippet": item.get("snippet", "")
-        })
-
-      if len(items) < results_per_page:
-        break  # Last page
-
-  return results
\ No newline at end of file
+  return {"results": results[:max_results], "errors": errors}
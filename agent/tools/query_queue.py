@@ -1,51 +1,231 @@
 # agent/tools/query_queue.py
+import os
+import socket
+from typing import Optional, Sequence
+
 import aiomysql
-from db.async_mysql import get_db_connection
+from agent.tools.serp_cache import query_fingerprint
+from db.async_mysql import acquire
+
+# A claimed row is owned by its worker until the lease expires
+LEASE_SECONDS = int(os.getenv("QUEUE_LEASE_SECONDS", "300"))
+# Attempts (claims) before a row is parked in the 'dead' state
+MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+# A finished row younger than this absorbs re-enqueues of the same query
+DEDUP_WINDOW_SECONDS = int(os.getenv("QUERY_DEDUP_WINDOW_SECONDS", str(7 * 24 * 3600)))
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
 
-async def enqueue_queries(queries: list[str]):
-    """Insert new search queries into the search_query_queue table."""
+
+async def enqueue_queries(queries: list[str]) -> list[int]:
+    """
+    Insert new search queries into the search_query_queue table.
+
+    Queries are keyed by their canonical fingerprint, so one multi-row
+    INSERT ... ON DUPLICATE KEY UPDATE collapses duplicates (case, spacing,
+    OR-term order) onto the existing row: pending/processing rows and rows
+    completed within QUERY_DEDUP_WINDOW_SECONDS are left alone; older 'done'
+    rows and 'failed'/'dead' ones go back to 'pending' with fresh attempts and
+    `requeues` bumped (see may_have_saved_results).
+    Returns the queue row id (search_id) for each input query, in order.
+    """
     if not queries:
-        return
+        return []
 
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        for q in queries:
+    fingerprints = [query_fingerprint(q) for q in queries]
+    first_seen: dict = {}
+    for fp, q in zip(fingerprints, queries):
+        first_seen.setdefault(fp, q)
+    unique = list(first_seen.items())
+
+    requeue = (
+        "(status IN ('failed', 'dead') OR (status = 'done' "
+        f"AND updated_at < NOW() - INTERVAL {int(DEDUP_WINDOW_SECONDS)} SECOND))"
+    )
+    # status must be assigned last: later assignments see earlier ones
+    sql = f"""
+INSERT INTO search_query_queue (fingerprint, query)
+VALUES (%s, %s)
+ON DUPLICATE KEY UPDATE
+  requeues = IF({requeue}, requeues + 1, requeues),
+  attempts = IF({requeue}, 0, attempts),
+  last_error = IF({requeue}, NULL, last_error),
+  status = IF({requeue}, 'pending', status)
+""".strip()
+
+    ids: dict = {}
+    async with acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.executemany(sql, unique)
+            in_clause = ",".join(["%s"] * len(unique))
             await cursor.execute(
-                "INSERT INTO search_query_queue (query) VALUES (%s)",
-                (q,)
+                f"SELECT fingerprint, id FROM search_query_queue WHERE fingerprint IN ({in_clause})",
+                tuple(fp for fp, _ in unique),
             )
-    conn.close()
+            ids = dict(await cursor.fetchall())
+
+    return [ids.get(fp) for fp in fingerprints]
+
+def may_have_saved_results(row: dict) -> bool:
+  """
+  True when a claimed row may already have results stored under its id:
+  an earlier attempt of this run, or an earlier run before it was re-enqueued.
+  """
+  return (row.get("attempts") or 1) > 1 or bool(row.get("requeues"))
+
+async def claim_queries(
+  worker_id: str,
+  limit: int = 5,
+  lease_seconds: Optional[int] = None,
+  ids: Optional[Sequence[int]] = None,
+) -> list[dict]:
+  """
+  Atomically claim up to `limit` pending rows for `worker_id`; with `ids`,
+  only rows among those search_ids.
+  SELECT ... FOR UPDATE SKIP LOCKED lets concurrent workers claim disjoint rows
+  without waiting on each other; each claim bumps `attempts` and sets a lease.
+  """
+  lease_seconds = LEASE_SECONDS if lease_seconds is None else lease_seconds
+  id_sql, id_params = "", ()
+  if ids is not None:
+    if not ids:
+      return []
+    id_sql = f" AND id IN ({','.join(['%s'] * len(ids))})"
+    id_params = tuple(ids)
+  async with acquire() as conn:
+    await conn.begin()
+    try:
+      async with conn.cursor(aiomysql.DictCursor) as cursor:
+        await cursor.execute(
+          "SELECT * FROM search_query_queue WHERE status = 'pending'" + id_sql +
+          " ORDER BY id LIMIT %s FOR UPDATE SKIP LOCKED",
+          (*id_params, limit)
+        )
+        rows = await cursor.fetchall()
+
+        ids = [row["id"] for row in rows]
+        if ids:
+          in_clause = ",".join(["%s"] * len(ids))
+          await cursor.execute(
+              f"""
+              UPDATE search_query_queue
+              SET status = 'processing',
+                  worker_id = %s,
+                  lease_expires_at = UTC_TIMESTAMP() + INTERVAL %s SECOND,
+                  attempts = attempts + 1
+              WHERE id IN ({in_clause})
+              """,
+              (worker_id, lease_seconds, *ids)
+          )
+      await conn.commit()
+    except BaseException:
+      await conn.rollback()
+      raise
+
+  for row in rows:
+    row["status"] = "processing"
+    row["worker_id"] = worker_id
+    row["attempts"] = (row.get("attempts") or 0) + 1
+  return list(rows)
 
 async def get_pending_queries(limit: int = 5):
-  conn = await get_db_connection()
-  async with conn.cursor(aiomysql.DictCursor) as cursor:
-    await cursor.execute(
-      "SELECT * FROM search_query_queue WHERE status = 'pending' LIMIT %s", (limit,)
-    )
-    rows = await cursor.fetchall()
+  """Claim pending rows for this process (see claim_queries)."""
+  return await claim_queries(default_worker_id(), limit=limit)
 
-    ids = [row["id"] for row in rows]
-    if ids:
-      in_clause = ",".join(["%s"] * len(ids))
+async def reap_expired_leases(max_attempts: Optional[int] = None) -> int:
+  """
+  Return rows whose lease expired (worker crashed or hung) to the queue,
+  or park them as 'dead' once they have used up their attempts.
+  Returns the number of rows reaped.
+  """
+  max_attempts = MAX_ATTEMPTS if max_attempts is None else max_attempts
+  async with acquire() as conn:
+    async with conn.cursor() as cursor:
       await cursor.execute(
-          f"UPDATE search_query_queue SET status = 'processing' WHERE id IN ({in_clause})",
-          tuple(ids)
+        """
+        UPDATE search_query_queue
+        SET status = IF(attempts >= %s, 'dead', 'pending'),
+            worker_id = NULL,
+            lease_expires_at = NULL,
+            last_error = 'lease expired'
+        WHERE status = 'processing' AND lease_expires_at < UTC_TIMESTAMP()
+        """,
+        (max_attempts,)
       )
-  conn.close()
-  return rows
-
-async def mark_query_done(search_id: int):
-  conn = await get_db_connection()
-  async with conn.cursor() as cursor:
-    await cursor.execute(
-      "UPDATE search_query_queue SET status = 'done' WHERE id = %s", (search_id,)
-    )
-  conn.close()
+      return cursor.rowcount
 
-async def mark_query_failed(search_id: int):
-  conn = await get_db_connection()
-  async with conn.cursor() as cursor:
-    await cursor.execute(
-        "UPDATE search_query_queue SET status = 'failed' WHERE id = %s", (search_id,)
-    )
-  conn.close()
+def _lease_clause(worker_id: Optional[str]) -> tuple:
+  # Only the current lease holder may finish a row; a worker whose lease
+  # expired (and was reaped / re-claimed) must not touch it any more
+  if worker_id is None:
+    return "", ()
+  return " AND status = 'processing' AND worker_id = %s", (worker_id,)
+
+async def mark_query_done(search_id: int, worker_id: Optional[str] = None) -> bool:
+  """
+  Mark a row done. With `worker_id`, only while that worker still holds the
+  lease. Returns False when nothing was updated (lease lost).
+  """
+  lease_sql, lease_params = _lease_clause(worker_id)
+  async with acquire() as conn:
+    async with conn.cursor() as cursor:
+      await cursor.execute(
+        "UPDATE search_query_queue "
+        "SET status = 'done', worker_id = NULL, lease_expires_at = NULL, last_error = NULL "
+        "WHERE id = %s" + lease_sql,
+        (search_id, *lease_params)
+      )
+      return cursor.rowcount > 0
+
+async def mark_query_failed(
+  search_id: int,
+  error: Optional[str] = None,
+  max_attempts: Optional[int] = None,
+  worker_id: Optional[str] = None,
+) -> bool:
+  """
+  Release the lease; retry later unless attempts are used up (then 'dead').
+  With `worker_id`, only while that worker still holds the lease.
+  Returns False when nothing was updated (lease lost).
+  """
+  max_attempts = MAX_ATTEMPTS if max_attempts is None else max_attempts
+  lease_sql, lease_params = _lease_clause(worker_id)
+  async with acquire() as conn:
+    async with conn.cursor() as cursor:
+      await cursor.execute(
+          """
+          UPDATE search_query_queue
+          SET status = IF(attempts >= %s, 'dead', 'pending'),
+              worker_id = NULL,
+              lease_expires_at = NULL,
+              last_error = %s
+          WHERE id = %s
+          """ + lease_sql,
+          (max_attempts, (error or "")[:2000], search_id, *lease_params)
+      )
+      return cursor.rowcount > 0
+
+async def release_query(search_id: int, worker_id: str, error: Optional[str] = None) -> bool:
+  """
+  Hand a leased row back to 'pending' without using up an attempt (the claim's
+  increment is undone), e.g. when the provider's circuit breaker shed the call.
+  Returns False when the worker no longer holds the lease.
+  """
+  lease_sql, lease_params = _lease_clause(worker_id)
+  async with acquire() as conn:
+    async with conn.cursor() as cursor:
+      await cursor.execute(
+          """
+          UPDATE search_query_queue
+          SET status = 'pending',
+              attempts = IF(attempts > 0, attempts - 1, 0),
+              worker_id = NULL,
+              lease_expires_at = NULL,
+              last_error = %s
+          WHERE id = %s
+          """ + lease_sql,
+          ((error or "")[:2000] or None, search_id, *lease_params)
+      )
+      return cursor.rowcount > 0
@@ -1,28 +1,82 @@
 # agent/tools/save_search_results.py
-from db.async_mysql import get_db_connection
+import os
+from typing import List, Optional, Set
 
-async def save_search_results(search_id: int, query: str, results: list[dict]):
+from db.async_mysql import acquire
+from services.salesql_client import linkedin_slug
+
+# Rows per multi-row INSERT statement
+INSERT_CHUNK_SIZE = int(os.getenv("SERP_INSERT_CHUNK_SIZE", "500"))
+
+_INSERT_SQL = """
+INSERT INTO google_search_results (search_id, query, title, link, snippet, linkedin_slug)
+VALUES (%s, %s, %s, %s, %s, %s)
+""".strip()
+
+
+async def _existing_links(cursor, search_id: int, links: List[str]) -> Set[str]:
+    found: Set[str] = set()
+    for i in range(0, len(links), INSERT_CHUNK_SIZE):
+        chunk = links[i:i + INSERT_CHUNK_SIZE]
+        in_clause = ",".join(["%s"] * len(chunk))
+        await cursor.execute(
+            f"SELECT link FROM google_search_results WHERE search_id = %s AND link IN ({in_clause})",
+            (search_id, *chunk),
+        )
+        found.update(r[0] for r in await cursor.fetchall())
+    return found
+
+
+async def save_search_results(
+    search_id: int,
+    query: str,
+    results: list[dict],
+    skip_existing: bool = False,
+    chunk_size: Optional[int] = None,
+) -> int:
     """
     Persist Google search results for a given search_id.
     Each result item should have keys: title, link, snippet.
+    The canonical profile slug of each link is stored alongside it.
+
+    Rows are written with multi-row INSERTs of `chunk_size` rows (default
+    SERP_INSERT_CHUNK_SIZE). With skip_existing=True, links already stored for
+    this search_id (or repeated within `results`) are dropped first.
+    Returns the number of rows inserted.
     """
     if not results:
-        return
-
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        for item in results:
-            await cursor.execute(
-                """
-                INSERT INTO google_search_results (search_id, query, title, link, snippet)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
+        return 0
+
+    chunk_size = chunk_size or INSERT_CHUNK_SIZE
+
+    async with acquire() as conn:
+        async with conn.cursor() as cursor:
+            if skip_existing:
+                links = [item.get("link") for item in results if item.get("link")]
+                seen = await _existing_links(cursor, search_id, list(dict.fromkeys(links)))
+                fresh = []
+                for item in results:
+                    link = item.get("link")
+                    if link in seen:
+                        continue
+                    if link:
+                        seen.add(link)
+                    fresh.append(item)
+                results = fresh
+
+            params = [
                 (
                     search_id,
                     query,
                     item.get("title"),
                     item.get("link"),
-                    item.get("snippet")
-                ),
-            )
-    conn.close()
+                    item.get("snippet"),
+                    linkedin_slug(item.get("link")),
+                )
+                for item in results
+            ]
+            for i in range(0, len(params), chunk_size):
+                # aiomysql rewrites INSERT ... VALUES executemany into one multi-row statement
+                await cursor.executemany(_INSERT_SQL, params[i:i + chunk_size])
+
+    return len(params)
@@ -0,0 +1,80 @@
+# agent/tools/serp_cache.py
+import hashlib
+import os
+import re
+from typing import Awaitable, Callable, List, Optional
+
+from services.cache import PersistentCache, make_key
+
+SERP_CACHE_TTL_SECONDS = int(os.getenv("SERP_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+SERP_CACHE_MEMORY_SIZE = int(os.getenv("SERP_CACHE_MEMORY_SIZE", "2048"))
+SERP_CACHE_ENABLED = os.getenv("SERP_CACHE_ENABLED", "1") == "1"
+
+serp_cache = PersistentCache("serp", ttl=SERP_CACHE_TTL_SECONDS, maxsize=SERP_CACHE_MEMORY_SIZE)
+
+_WS = re.compile(r"\s+")
+_TOKEN = re.compile(r'"[^"]*"|\S+')
+_OR_GROUP = re.compile(r"\(([^()]*)\)")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Case/whitespace-insensitive form of a search query. The upper-case OR
+    operator is kept as-is (Google treats a lower-case 'or' as a plain word):
+      'site:LinkedIn.com/in  ( "Python Dev" OR "x" )  Pune' -> 'site:linkedin.com/in ("python dev" OR "x") pune'
+    """
+    q = _WS.sub(" ", (query or "").strip())
+    q = _TOKEN.sub(lambda m: m.group(0) if m.group(0) == "OR" else m.group(0).lower(), q)
+    return q.replace("( ", "(").replace(" )", ")")
+
+
+def canonical_query(query: str) -> str:
+    """
+    normalize_query() plus order-insensitive OR groups, so equivalent queries
+    compare equal:
+      '("B" OR "a") Pune' and '("a" OR "b")  pune' -> '("a" OR "b") pune'
+    """
+    def _sort_group(m: re.Match) -> str:
+        terms = {t.strip() for t in m.group(1).split(" OR ") if t.strip()}
+        return "(" + " OR ".join(sorted(terms)) + ")"
+
+    return _OR_GROUP.sub(_sort_group, normalize_query(query))
+
+
+def query_fingerprint(query: str) -> str:
+    """sha256 hex of canonical_query(); stored in search_query_queue.fingerprint."""
+    return hashlib.sha256(canonical_query(query).encode("utf-8")).hexdigest()
+
+
+def serp_cache_key(provider: str, query: str, num_results: int) -> str:
+    return make_key(provider, canonical_query(query), int(num_results))
+
+
+async def get_cached_results(provider: str, query: str, num_results: int) -> Optional[List[dict]]:
+    if not SERP_CACHE_ENABLED:
+        return None
+    return await serp_cache.get(serp_cache_key(provider, query, num_results))
+
+
+async def store_results(provider: str, query: str, num_results: int, results: List[dict]) -> None:
+    if SERP_CACHE_ENABLED:
+        await serp_cache.set(serp_cache_key(provider, query, num_results), results)
+
+
+async def cached_search(
+    provider: str,
+    query: str,
+    num_results: int,
+    fetch: Callable[[], Awaitable[List[dict]]],
+) -> List[dict]:
+    """
+    Return cached results for (provider, canonical query, num_results), or call
+    `fetch()` and cache what it returns. `fetch` must raise on failure so that
+    errors are never cached as empty result sets.
+    """
+    cached = await get_cached_results(provider, query, num_results)
+    if cached is not None:
+        return cached
+    results = await fetch()
+    await store_results(provider, query, num_results, results)
+    return results
@@ -1,33 +1,35 @@
+import asyncio
 import os
+from typing import Any, List, Optional, Union
+
 import httpx
 from dotenv import load_dotenv
 
+from agent.tools.serp_cache import cached_search, get_cached_results, store_results
+from services.http_clients import get_http_client
+from services.providers import call_provider
+
 load_dotenv()
 
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
+# Queries packed into one Serper request by serper_linkedin_search_batch()
+SERPER_BATCH_SIZE = int(os.getenv("SERPER_BATCH_SIZE", "10"))
 
-async def serper_linkedin_search(query: str, num_results: int = 20) -> list[dict]:
-    """
-    Search Google via Serper.dev API and return only LinkedIn profile results.
-    """
-    url = "https://google.serper.dev/search"
-    headers = {
+
+class SerperError(Exception):
+    pass
+
+
+def _headers() -> dict:
+    return {
         "X-API-KEY": SERPER_API_KEY,
         "Content-Type": "application/json"
     }
-    payload = {"q": query, "num": num_results}
 
-    results = []
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
-        except Exception as e:
-            print(f"[Serper LinkedIn Search] Error for query='{query}': {e}")
-            return []
 
+def _linkedin_results(data: dict) -> list[dict]:
     # Extract organic results and filter for LinkedIn profiles
+    results = []
     for item in data.get("organic", []):
         link = item.get("link", "")
         if "linkedin.com/in" in link.lower():
@@ -36,5 +38,102 @@ async def serper_linkedin_search(query: str, num_results: int = 20) -> list[dict
                 "link": link,
                 "snippet": item.get("snippet", "")
             })
-
     return results
+
+
+async def _post_search(payload: Any) -> httpx.Response:
+    response = await get_http_client("serper").post("/search", headers=_headers(), json=payload)
+    response.raise_for_status()
+    return response
+
+
+async def _fetch_serper(query: str, num_results: int) -> list[dict]:
+    """One Serper.dev call (rate-limited and retried); raises once retries run out."""
+    payload = {"q": query, "num": num_results}
+
+    response = await call_provider("serper", lambda: _post_search(payload))
+    return _linkedin_results(response.json())
+
+
+async def _fetch_serper_batch(queries: List[str], num_results: int) -> List[Union[list, Exception]]:
+    """
+    One Serper.dev call for several queries (JSON array body, array response
+    in the same order). A failed request raises; a bad entry for one query
+    comes back as a SerperError in that query's slot.
+    """
+    payload = [{"q": q, "num": num_results} for q in queries]
+
+    response = await call_provider("serper", lambda: _post_search(payload))
+    data = response.json()
+    if not isinstance(data, list):
+        raise SerperError(f"Expected a list for a batch of {len(queries)} queries, got {type(data).__name__}")
+
+    out: List[Union[list, Exception]] = []
+    for i, query in enumerate(queries):
+        item = data[i] if i < len(data) else None
+        if not isinstance(item, dict):
+            out.append(SerperError(f"No result for query='{query}' in batch response"))
+        elif "organic" not in item and (item.get("error") or item.get("message")):
+            out.append(SerperError(str(item.get("error") or item.get("message"))))
+        else:
+            out.append(_linkedin_results(item))
+    return out
+
+
+async def serper_linkedin_search(query: str, num_results: int = 20, raise_errors: bool = False) -> list[dict]:
+    """
+    Search Google via Serper.dev API and return only LinkedIn profile results.
+    Results are served from the SERP cache when the same normalized query was
+    fetched recently. Errors return [] unless raise_errors=True.
+    """
+    try:
+        return await cached_search(
+            "serper", query, num_results, lambda: _fetch_serper(query, num_results)
+        )
+    except Exception as e:
+        if raise_errors:
+            raise
+        print(f"[Serper LinkedIn Search] Error for query='{query}': {e}")
+        return []
+
+
+async def serper_linkedin_search_batch(
+    queries: List[str],
+    num_results: int = 20,
+    batch_size: Optional[int] = None,
+) -> List[Union[list, Exception]]:
+    """
+    Batch form of serper_linkedin_search for many queries. Cache hits are
+    answered locally; misses go out `batch_size` (SERPER_BATCH_SIZE) per
+    request. Returns one entry per input query, in order: its results, or
+    the exception that query failed with (a failed request fails every query
+    packed into it).
+    """
+    batch_size = max(1, batch_size or SERPER_BATCH_SIZE)
+    out: List[Union[list, Exception, None]] = [None] * len(queries)
+
+    misses: List[int] = []
+    for i, query in enumerate(queries):
+        cached = await get_cached_results("serper", query, num_results)
+        if cached is not None:
+            out[i] = cached
+        else:
+            misses.append(i)
+
+    async def _run(indexes: List[int]) -> None:
+        chunk = [queries[i] for i in indexes]
+        try:
+            if len(chunk) == 1:
+                results: List[Union[list, Exception]] = [await _fetch_serper(chunk[0], num_results)]
+            else:
+                results = await _fetch_serper_batch(chunk, num_results)
+        except Exception as e:
+            print(f"[Serper LinkedIn Search] Batch of {len(chunk)} failed: {e}")
+            results = [e] * len(chunk)
+        for i, result in zip(indexes, results):
+            out[i] = result
+            if not isinstance(result, Exception):
+                await store_results("serper", queries[i], num_results, result)
+
+    await asyncio.gather(*(_run(misses[j:j + batch_size]) for j in range(0, len(misses), batch_size)))
+    return out
@@ -1,30 +1,250 @@
 # agent/workers/linkedin_search_worker.py
-from agent.tools.serper_linkedin_search import serper_linkedin_search
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from agent.tools.serper_linkedin_search import serper_linkedin_search_batch, SERPER_BATCH_SIZE
 from agent.tools.save_search_results import save_search_results
-from agent.tools.query_queue import get_pending_queries, mark_query_done, mark_query_failed
+from agent.tools.query_queue import (
+    claim_queries,
+    default_worker_id,
+    mark_query_done,
+    mark_query_failed,
+    may_have_saved_results,
+    reap_expired_leases,
+    release_query,
+)
+from services.cache import purge_expired_entries
+from services.providers import CircuitOpenError, circuit_retry_in
+
+# Serper requests kept in flight by the continuous worker (each carries up to
+# SERPER_BATCH_SIZE queue rows)
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "10"))
+# Idle backoff when the queue is empty: starts at MIN, doubles up to MAX
+IDLE_BACKOFF_MIN = float(os.getenv("WORKER_IDLE_BACKOFF_MIN", "0.5"))
+IDLE_BACKOFF_MAX = float(os.getenv("WORKER_POLL_INTERVAL", "20"))
+REAP_INTERVAL_SECONDS = float(os.getenv("WORKER_REAP_INTERVAL", "30"))
+# Expired provider-cache rows (services/cache.py) are deleted this often
+CACHE_PURGE_INTERVAL_SECONDS = float(os.getenv("WORKER_CACHE_PURGE_INTERVAL", "3600"))
+
+# Called with (row, results) after a row's results are saved (agent/pipeline.py)
+OnSaved = Callable[[Dict[str, Any], List[dict]], Awaitable[None]]
+
+
+async def _finish_row(row: Dict[str, Any], results: Any, on_saved: Optional[OnSaved] = None) -> Dict[str, Any]:
+    """Save -> mark done (or mark failed) -> on_saved for one claimed row. Never raises."""
+    qid = row["id"]
+    qtext = row["query"]
+    if isinstance(results, CircuitOpenError) and not results.attempted:
+        # Shed before any request was sent: requeue without spending an attempt
+        try:
+            if not await release_query(qid, row.get("worker_id"), str(results)):
+                print({"worker_lease_lost": qid, "worker_id": row.get("worker_id")})
+        except Exception:
+            pass  # lease will expire and the reaper will requeue it
+        return {"search_id": qid, "query": qtext, "error": str(results), "requeued": True}
+    try:
+        if isinstance(results, Exception):
+            raise results
+        # A retried or re-enqueued row may already have results saved
+        saved = await save_search_results(qid, qtext, results, skip_existing=may_have_saved_results(row))
+        if not await mark_query_done(qid, worker_id=row.get("worker_id")):
+            print({"worker_lease_lost": qid, "worker_id": row.get("worker_id")})
+    except Exception as e:
+        try:
+            if not await mark_query_failed(qid, str(e), worker_id=row.get("worker_id")):
+                print({"worker_lease_lost": qid, "worker_id": row.get("worker_id")})
+        except Exception:
+            pass  # lease will expire and the reaper will requeue it
+        return {"search_id": qid, "query": qtext, "error": str(e)}
+    if on_saved is not None:
+        try:
+            await on_saved(row, results)
+        except Exception as e:
+            print({"worker_error": f"on_saved failed for search_id={qid}: {e}"})
+    return {"search_id": qid, "query": qtext, "saved": saved}
 
-async def run_linkedin_search_worker(max_results_per_query: int = 20) -> dict:
+
+async def _process_batch(
+    rows: List[Dict[str, Any]],
+    max_results_per_query: int,
+    on_saved: Optional[OnSaved] = None,
+) -> List[Dict[str, Any]]:
+    """One Serper request for all `rows`, then each row is saved/marked on its own."""
+    try:
+        results = await serper_linkedin_search_batch(
+            [row["query"] for row in rows],
+            num_results=max_results_per_query,
+            batch_size=len(rows),
+        )
+    except Exception as e:
+        results = [e] * len(rows)
+    return list(await asyncio.gather(*(_finish_row(row, r, on_saved) for row, r in zip(rows, results))))
+
+
+def _batches(rows: List[Dict[str, Any]], size: int) -> List[List[Dict[str, Any]]]:
+    size = max(1, size)
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+async def run_linkedin_search_worker(
+    max_results_per_query: int = 20,
+    worker_id: Optional[str] = None,
+    limit: int = 5,
+    concurrency: int = 1,
+    batch_size: Optional[int] = None,
+    on_saved: Optional[OnSaved] = None,
+    search_ids: Optional[List[int]] = None,
+) -> dict:
     """
     Processes pending queries:
-      - pulls from search_query_queue
-      - calls Serper.dev for LinkedIn
-      - saves results to google_search_results
+      - claims up to `limit` rows from search_query_queue under a lease for this worker
+        (with `search_ids`, only those rows; ones that are not pending, e.g.
+        already done or claimed elsewhere, are listed under "not_claimed")
+      - calls Serper.dev for LinkedIn, `batch_size` queries per request,
+        `concurrency` requests at a time
+      - saves results to google_search_results, then awaits on_saved(row, results)
+    Failed rows go back to the queue until their attempts run out; rows shed
+    by Serper's open circuit go back without using an attempt, and nothing is
+    claimed while the circuit is open.
     Returns a small summary for the API response.
     """
     processed = []
     failed = []
 
-    queries = await get_pending_queries(limit=5)
-    for row in queries:
-        qid = row["id"]
-        qtext = row["query"]
-        try:
-            results = await serper_linkedin_search(qtext, num_results=max_results_per_query)
-            await save_search_results(qid, qtext, results)
-            await mark_query_done(qid)
-            processed.append({"search_id": qid, "query": qtext, "saved": len(results)})
-        except Exception as e:
-            await mark_query_failed(qid)
-            failed.append({"search_id": qid, "query": qtext, "error": str(e)})
+    summary: Dict[str, Any] = {"processed": processed, "failed": failed}
+
+    shed = circuit_retry_in("serper")
+    if shed > 0:
+        summary["circuit_open_retry_in"] = round(shed, 1)
+        if search_ids is not None:
+            summary["not_claimed"] = list(search_ids)
+        return summary
+
+    queries = await claim_queries(worker_id or default_worker_id(), limit=limit, ids=search_ids)
+    if search_ids is not None:
+        claimed = {row["id"] for row in queries}
+        summary["not_claimed"] = [s for s in search_ids if s not in claimed]
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _run(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        async with sem:
+            return await _process_batch(batch, max_results_per_query, on_saved)
+
+    batches = _batches(list(queries), batch_size or SERPER_BATCH_SIZE)
+    for entries in await asyncio.gather(*(_run(batch) for batch in batches)):
+        for entry in entries:
+            (failed if "error" in entry else processed).append(entry)
+
+    return summary
+
+
+async def run_continuous_search_worker(
+    max_results_per_query: int = 20,
+    worker_id: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    stop_event: Optional[asyncio.Event] = None,
+    drain: bool = False,
+    batch_size: Optional[int] = None,
+) -> dict:
+    """
+    Keeps up to `concurrency` Serper requests in flight, each packing up to
+    `batch_size` rows, and claims new rows as soon as slots free up. Backs off
+    (IDLE_BACKOFF_MIN doubling to IDLE_BACKOFF_MAX) only while the queue is empty.
+
+    drain=True returns once the queue is empty and nothing is in flight;
+    otherwise runs until `stop_event` is set, then stops claiming and waits
+    for in-flight searches to finish. Returns running totals.
+    """
+    worker_id = worker_id or default_worker_id()
+    concurrency = max(1, concurrency or WORKER_CONCURRENCY)
+    batch_size = max(1, batch_size or SERPER_BATCH_SIZE)
+    stop_event = stop_event or asyncio.Event()
+    totals = {"processed": 0, "failed": 0, "saved": 0}
+    in_flight: set = set()
+    backoff = IDLE_BACKOFF_MIN
+    next_reap = 0.0
+    next_purge = 0.0
+
+    def _collect(done: set) -> None:
+        for task in done:
+            for entry in task.result():
+                if "error" in entry:
+                    totals["failed"] += 1
+                    print({"worker_failed": entry})
+                else:
+                    totals["processed"] += 1
+                    totals["saved"] += entry["saved"]
+
+    try:
+        while not stop_event.is_set():
+            if time.monotonic() >= next_reap:
+                next_reap = time.monotonic() + REAP_INTERVAL_SECONDS
+                try:
+                    reaped = await reap_expired_leases()
+                    if reaped:
+                        print({"worker_reaped": reaped})
+                except Exception as e:
+                    print({"worker_error": f"reap failed: {e}"})
+
+            if time.monotonic() >= next_purge:
+                next_purge = time.monotonic() + CACHE_PURGE_INTERVAL_SECONDS
+                try:
+                    purged = await purge_expired_entries()
+                    if purged:
+                        print({"worker_cache_purged": purged})
+                except Exception as e:
+                    print({"worker_error": f"cache purge failed: {e}"})
+
+            # Serper is down: don't claim rows just to burn their attempts
+            shed = circuit_retry_in("serper")
+            if shed > 0 and not in_flight:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=shed)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Slots are requests; each free slot can take a full batch of rows
+            free = 0 if shed > 0 else (concurrency - len(in_flight)) * batch_size
+            claimed = 0
+            if free > 0:
+                try:
+                    rows = await claim_queries(worker_id, limit=free)
+                except Exception as e:
+                    print({"worker_error": f"claim failed: {e}"})
+                    rows = []
+                claimed = len(rows)
+                for batch in _batches(list(rows), batch_size):
+                    in_flight.add(asyncio.create_task(_process_batch(batch, max_results_per_query)))
+
+            if claimed:
+                backoff = IDLE_BACKOFF_MIN
+            elif not in_flight:
+                if drain:
+                    break
+                # Queue empty and nothing running: back off, but wake on stop
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=backoff)
+                except asyncio.TimeoutError:
+                    pass
+                backoff = min(backoff * 2, IDLE_BACKOFF_MAX)
+                continue
+
+            # Queue still had work: refill as soon as any slot frees up.
+            # Queue ran short: also re-check it after `backoff` while tasks run.
+            timeout = None if claimed == free else backoff
+            done, in_flight = await asyncio.wait(
+                in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            _collect(done)
+            if not done and claimed < free:
+                backoff = min(backoff * 2, IDLE_BACKOFF_MAX)
+    finally:
+        # Graceful stop: no new claims, but finish what we already leased
+        if in_flight:
+            done, _ = await asyncio.wait(in_flight)
+            _collect(done)
 
-    return {"processed": processed, "failed": failed}
+    return totals
@@ -1,39 +1,176 @@
 # api/people_routes.py
-from fastapi import APIRouter, Query
-from typing import List, Optional, Literal
-from models.schemas import PeopleSearchResponse, PeopleItem
-from db.people_repo import search_people
+import csv
+import io
+import os
+import zlib
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional, Literal
+from models.schemas import PeopleSearchResponse
+from db.people_repo import InvalidCursor, iter_people, search_people
+from db.search_versions import get_search_version
+from api.responses import dumps, json_response
+from services.cache import TTLCache, make_key
 
 router = APIRouter(tags=["People"])
 
+# Serialized /api/people pages keyed by (normalized params, data version of the
+# search): an enrichment write bumps the version, so stale entries are never hit
+PEOPLE_RESPONSE_CACHE_SIZE = int(os.getenv("PEOPLE_RESPONSE_CACHE_SIZE", "512"))
+PEOPLE_RESPONSE_CACHE_TTL = float(os.getenv("PEOPLE_RESPONSE_CACHE_TTL", "300"))
+_response_cache = TTLCache(maxsize=PEOPLE_RESPONSE_CACHE_SIZE, ttl=PEOPLE_RESPONSE_CACHE_TTL)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
 @router.get("/people", response_model=PeopleSearchResponse, summary="List enriched people")
 async def list_people(
+    request: Request,
     search_id: Optional[int] = None,
     q: Optional[str] = None,
     tech_stack: Optional[List[str]] = Query(default=None, alias="tech_stack"),
     locations: Optional[List[str]] = Query(default=None, alias="locations"),
-    sort: Literal["recent", "name"] = "recent",
+    sort: Literal["recent", "name", "relevance"] = "recent",
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    count_mode: Literal["exact", "cached", "approx", "none"] = "exact",
+    fields: Literal["summary", "contact", "full"] = "full",
 ):
-    records, total = await search_people(
-        search_id=search_id,
-        q=q,
-        tech_stack=tech_stack or [],
-        locations=locations or [],
-        sort=sort,
-        limit=limit,
-        offset=offset,
+    """
+    `q` uses the FULLTEXT index (every word, prefix match) when the search_doc
+    column exists and all words are indexable; otherwise a LIKE scan.
+    sort=relevance orders full-text matches by score (else falls back to recent).
+
+    Pass `cursor` (the previous response's next_cursor) instead of `offset` for
+    pages that cost the same however deep they are. `count_mode` picks how
+    `count` is computed: exact, cached (per filter, short TTL), approx, none (null).
+    `fields` picks the columns returned per item (summary, contact, full); rows
+    are serialized as read, without re-validating them into PeopleItem.
+
+    Pages are cached per normalized query and the search's data version, which
+    every enrichment write bumps. The ETag names that pair, so If-None-Match
+    gets a 304 and a repeated poll gets the cached body, both without querying
+    people (the version itself is re-read at most every few seconds).
+    """
+    version = await get_search_version(search_id)
+    key = make_key(
+        "people", search_id, " ".join((q or "").split()), sorted(tech_stack or []),
+        sorted(locations or []), sort, limit, offset, cursor, count_mode, fields, version,
     )
-    items = [PeopleItem(**r) for r in records]
-    return PeopleSearchResponse(
-        q=q,
+    etag = f'"{key[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    body = _response_cache.get(key)
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    try:
+        records, total, next_cursor = await search_people(
+            search_id=search_id,
+            q=q,
+            tech_stack=tech_stack or [],
+            locations=locations or [],
+            sort=sort,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            count_mode=count_mode,
+            fields=fields,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Shape of PeopleSearchResponse; rows come from our own table, so skip the model
+    response = json_response({
+        "q": q,
+        "search_id": search_id,
+        "tech_stack": tech_stack or [],
+        "locations": locations or [],
+        "sort": sort,
+        "limit": limit,
+        "offset": 0 if cursor else offset,
+        "count": total,
+        "count_mode": count_mode,
+        "next_cursor": next_cursor,
+        "fields": fields,
+        "items": records,
+    }, headers=headers)
+    _response_cache.set(key, response.body)
+    return response
+
+
+async def _ndjson_chunks(rows: AsyncIterator) -> AsyncIterator[bytes]:
+    async for _, batch in rows:
+        yield b"".join(dumps(r) + b"\n" for r in batch)
+
+
+async def _csv_chunks(rows: AsyncIterator) -> AsyncIterator[bytes]:
+    header_sent = False
+    async for names, batch in rows:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        if not header_sent:
+            writer.writerow(names)
+            header_sent = True
+        for r in batch:
+            writer.writerow(
+                "" if r[c] is None else (r[c].isoformat() if hasattr(r[c], "isoformat") else r[c])
+                for c in names
+            )
+        yield buf.getvalue().encode("utf-8")
+
+
+async def _gzipped(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    async for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+@router.get("/people/export", summary="Stream enriched people as NDJSON or CSV")
+async def export_people(
+    request: Request,
+    search_id: Optional[int] = None,
+    q: Optional[str] = None,
+    tech_stack: Optional[List[str]] = Query(default=None, alias="tech_stack"),
+    locations: Optional[List[str]] = Query(default=None, alias="locations"),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    fields: Literal["summary", "contact", "full"] = "full",
+    after_id: Optional[int] = Query(default=None, ge=0, description="resume after this id"),
+    gzip: Optional[bool] = Query(default=None, description="default: on if Accept-Encoding allows"),
+):
+    """
+    Every matching row in id order, streamed from a server-side cursor in
+    PEOPLE_EXPORT_FETCH_SIZE batches (constant memory, one request).
+    Each row carries its id: to resume a broken download, pass the last id
+    received as `after_id`. CSV keeps JSON columns as their JSON text.
+    """
+    rows = iter_people(
         search_id=search_id,
+        q=q,
         tech_stack=tech_stack or [],
         locations=locations or [],
-        sort=sort,
-        limit=limit,
-        offset=offset,
-        count=total,
-        items=items,
+        fields=fields,
+        after_id=after_id,
+        decode_json=(format == "ndjson"),
     )
+    chunks = _ndjson_chunks(rows) if format == "ndjson" else _csv_chunks(rows)
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv; charset=utf-8"
+    filename = f"people-{search_id if search_id is not None else 'all'}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if gzip is None:
+        gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+    if gzip:
+        chunks = _gzipped(chunks)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
@@ -0,0 +1,38 @@
+# api/responses.py
+"""
+JSON responses for rows we already trust (straight from our own tables):
+serialized once, without building and re-validating pydantic models.
+Uses orjson (in requirements.txt); falls back to the stdlib encoder if it is missing.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+
+try:  # optional fast encoder
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    _ORJSON_AVAILABLE = False
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", "replace")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    if _ORJSON_AVAILABLE:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(payload: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(content=dumps(payload), status_code=status_code, headers=headers, media_type="application/json")
@@ -1,12 +1,37 @@
 # db/async_mysql.py
+import asyncio
 import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
 import aiomysql
 from dotenv import load_dotenv
 
 load_dotenv()
 
-async def get_db_connection():
-  return await aiomysql.connect(
+# Pool sizing / health knobs (override via .env)
+POOL_MINSIZE = int(os.getenv("MYSQL_POOL_MINSIZE", "1"))
+POOL_MAXSIZE = int(os.getenv("MYSQL_POOL_MAXSIZE", "10"))
+POOL_ACQUIRE_TIMEOUT = float(os.getenv("MYSQL_POOL_ACQUIRE_TIMEOUT", "10"))
+POOL_RECYCLE = int(os.getenv("MYSQL_POOL_RECYCLE", "3600"))  # seconds; -1 disables
+POOL_PRE_PING = os.getenv("MYSQL_POOL_PRE_PING", "1") == "1"
+
+_pool: Optional[aiomysql.Pool] = None
+_pool_lock = asyncio.Lock()
+
+_stats: Dict[str, Any] = {
+  "acquired": 0,
+  "acquire_timeouts": 0,
+  "waiting": 0,
+  "acquire_ms_total": 0.0,
+  "acquire_ms_max": 0.0,
+  "discarded": 0,
+}
+
+
+def _connect_kwargs() -> Dict[str, Any]:
+  return dict(
     host=os.getenv("MYSQL_HOST"),
     port=int(os.getenv("MYSQL_PORT")),
     user=os.getenv("MYSQL_USER"),
@@ -14,3 +39,109 @@ async def get_db_connection():
     db=os.getenv("MYSQL_DB"),
     autocommit=True
   )
+
+
+async def get_db_connection():
+  """
+  Open a standalone connection (caller must close it).
+  Prefer `acquire()` which borrows from the shared pool.
+  """
+  return await aiomysql.connect(**_connect_kwargs())
+
+
+async def init_pool(
+  minsize: Optional[int] = None,
+  maxsize: Optional[int] = None,
+  pool_recycle: Optional[int] = None,
+) -> aiomysql.Pool:
+  """Create the process-wide pool (idempotent). Call once at app/worker startup."""
+  global _pool
+  async with _pool_lock:
+    if _pool is None or _pool.closed:
+      _pool = await aiomysql.create_pool(
+        minsize=POOL_MINSIZE if minsize is None else minsize,
+        maxsize=POOL_MAXSIZE if maxsize is None else maxsize,
+        pool_recycle=POOL_RECYCLE if pool_recycle is None else pool_recycle,
+        **_connect_kwargs(),
+      )
+  return _pool
+
+
+async def close_pool() -> None:
+  """Close the pool and wait for borrowed connections to be returned."""
+  global _pool
+  async with _pool_lock:
+    if _pool is not None:
+      _pool.close()
+      await _pool.wait_closed()
+      _pool = None
+
+
+@asynccontextmanager
+async def acquire() -> AsyncIterator[aiomysql.Connection]:
+  """
+  Borrow a connection from the shared pool:
+
+      async with acquire() as conn:
+          async with conn.cursor() as cur:
+              ...
+
+  The pool is created lazily if startup did not call init_pool() (scripts).
+  Connections that hit a connection-level error are closed instead of reused.
+  """
+  pool = _pool if _pool is not None and not _pool.closed else await init_pool()
+
+  _stats["waiting"] += 1
+  started = time.perf_counter()
+  try:
+    conn = await asyncio.wait_for(pool.acquire(), timeout=POOL_ACQUIRE_TIMEOUT)
+  except asyncio.TimeoutError:
+    _stats["acquire_timeouts"] += 1
+    raise
+  finally:
+    _stats["waiting"] -= 1
+
+  elapsed_ms = (time.perf_counter() - started) * 1000
+  _stats["acquired"] += 1
+  _stats["acquire_ms_total"] += elapsed_ms
+  _stats["acquire_ms_max"] = max(_stats["acquire_ms_max"], elapsed_ms)
+
+  try:
+    if POOL_PRE_PING:
+      await conn.ping(reconnect=True)
+    yield conn
+  except (aiomysql.OperationalError, aiomysql.InterfaceError):
+    # Broken socket / server gone away: don't hand it to the next caller
+    _stats["discarded"] += 1
+    conn.close()
+    raise
+  finally:
+    await pool.release(conn)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+  """Snapshot of pool usage for sizing under load."""
+  acquired = _stats["acquired"]
+  snapshot: Dict[str, Any] = {
+    "initialized": _pool is not None and not _pool.closed,
+    "minsize": None,
+    "maxsize": None,
+    "size": 0,
+    "free": 0,
+    "in_use": 0,
+    "waiting": _stats["waiting"],
+    "acquired": acquired,
+    "acquire_timeouts": _stats["acquire_timeouts"],
+    "discarded": _stats["discarded"],
+    "acquire_ms_avg": round(_stats["acquire_ms_total"] / acquired, 3) if acquired else 0.0,
+    "acquire_ms_max": round(_stats["acquire_ms_max"], 3),
+  }
+  if _pool is not None:
+    snapshot.update(
+      minsize=_pool.minsize,
+      maxsize=_pool.maxsize,
+      size=_pool.size,
+      free=_pool.freesize,
+      in_use=_pool.size - _pool.freesize,
+    )
+  return snapshot
@@ -0,0 +1,117 @@
+# db/batch_writer.py
+import asyncio
+import time
+import weakref
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+FlushFn = Callable[[Sequence[Any]], Awaitable[Any]]
+ErrorFn = Callable[[Sequence[Any], BaseException], Any]
+
+_CLOSED = object()
+_live_writers: "weakref.WeakSet[BatchWriter]" = weakref.WeakSet()
+
+
+class BatchWriter:
+    """
+    Collects items from many producers and hands them to `flush_fn` in batches.
+
+    A batch is flushed when it reaches `max_batch` items or `max_delay` seconds
+    after its first item arrived, whichever comes first. Producers block in
+    add() once `max_pending` items are queued, so a slow DB pushes back on them.
+    Flushes run one at a time; a failed flush is passed to `on_error` and the
+    writer keeps going.
+
+        async with BatchWriter(save_salesql_people, max_batch=200) as writer:
+            await writer.add(row)
+        # leaving the block flushes everything still buffered
+    """
+
+    def __init__(
+        self,
+        flush_fn: FlushFn,
+        max_batch: int = 200,
+        max_delay: float = 0.5,
+        max_pending: int = 1000,
+        on_error: Optional[ErrorFn] = None,
+    ) -> None:
+        self._flush_fn = flush_fn
+        self._on_error = on_error
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(self.max_batch, max_pending))
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.stats = {"added": 0, "written": 0, "failed": 0, "flushes": 0}
+
+    async def __aenter__(self) -> "BatchWriter":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            _live_writers.add(self)
+
+    async def add(self, item: Any) -> None:
+        """Queue one item; waits while the buffer is full (backpressure)."""
+        if self._closing:
+            raise RuntimeError("BatchWriter is closed")
+        self.start()
+        await self._queue.put(item)
+        self.stats["added"] += 1
+
+    async def close(self) -> None:
+        """Flush everything buffered, then stop. Safe to call more than once."""
+        if self._closing:
+            if self._task is not None:
+                await asyncio.shield(self._task)
+            return
+        self._closing = True
+        if self._task is None:
+            return
+        await self._queue.put(_CLOSED)
+        await asyncio.shield(self._task)
+        _live_writers.discard(self)
+
+    async def _run(self) -> None:
+        done = False
+        while not done:
+            first = await self._queue.get()
+            if first is _CLOSED:
+                break
+            batch: List[Any] = [first]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _CLOSED:
+                    done = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Any]) -> None:
+        self.stats["flushes"] += 1
+        try:
+            await self._flush_fn(batch)
+            self.stats["written"] += len(batch)
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            if self._on_error is not None:
+                self._on_error(batch, e)
+            else:
+                print(f"[BatchWriter] Flush of {len(batch)} items failed: {e}")
+
+
+async def close_all_writers() -> None:
+    """Flush every writer still open in this process (app/worker shutdown hook)."""
+    for writer in list(_live_writers):
+        await writer.close()
@@ -0,0 +1,11 @@
+-- Shared key/value store behind services/cache.PersistentCache (SERP, enrichment, LLM caches).
+CREATE TABLE cache_entries (
+    namespace VARCHAR(32) NOT NULL,
+    cache_key CHAR(64) NOT NULL,
+    value_json LONGTEXT NOT NULL,
+    expires_at DATETIME NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (namespace, cache_key),
+    INDEX idx_cache_entries_expires (expires_at)
+);
@@ -0,0 +1,7 @@
+-- Shared rate limit state for services/providers.py: one row per external provider.
+-- next_slot_us is the earliest start (unix microseconds) of the next free call slot.
+CREATE TABLE provider_quota (
+    provider VARCHAR(32) NOT NULL PRIMARY KEY,
+    next_slot_us BIGINT UNSIGNED NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
@@ -0,0 +1,10 @@
+-- Global SalesQL enrichment store, shared by every search.
+-- Keyed by canonical profile URL (services/salesql_client.canonical_linkedin_url).
+CREATE TABLE salesql_person_cache (
+    canonical_url VARCHAR(512) NOT NULL PRIMARY KEY,
+    not_found TINYINT(1) NOT NULL DEFAULT 0,
+    payload_json JSON NULL,
+    fetched_at DATETIME NOT NULL,
+
+    INDEX idx_salesql_person_cache_fetched (fetched_at)
+);
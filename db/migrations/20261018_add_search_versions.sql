@@ -0,0 +1,7 @@
+-- Data version per search_id (0 = any search), bumped by every enrichment write
+-- (db/search_versions.py). GET /api/people keys its response cache and ETags on it.
+CREATE TABLE search_versions (
+    search_id INT UNSIGNED NOT NULL PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
@@ -0,0 +1,25 @@
+-- Canonical LinkedIn profile slug (services/salesql_client.linkedin_slug), filled at insert time.
+-- Enrichment reads distinct profiles per search from idx_gsr_search_slug instead of scanning with LIKE.
+ALTER TABLE google_search_results
+    ADD COLUMN linkedin_slug VARCHAR(255) NULL,
+    ADD INDEX idx_gsr_search_slug (search_id, linkedin_slug),
+    ADD INDEX idx_gsr_slug (linkedin_slug);
+
+ALTER TABLE salesql_enriched_people
+    ADD COLUMN linkedin_slug VARCHAR(255) NULL AFTER linkedin_url,
+    ADD INDEX idx_sep_search_slug (search_id, linkedin_slug),
+    ADD INDEX idx_sep_slug (linkedin_slug);
+
+-- Backfill existing rows. Same rule as linkedin_slug() except that
+-- percent-encoded slugs stay encoded; new rows are decoded in Python.
+UPDATE google_search_results
+SET linkedin_slug = NULLIF(LOWER(SUBSTRING_INDEX(SUBSTRING_INDEX(SUBSTRING_INDEX(
+        SUBSTRING_INDEX(LOWER(link), 'linkedin.com/in/', -1), '/', 1), '?', 1), '#', 1)), '')
+WHERE linkedin_slug IS NULL
+  AND link LIKE '%linkedin.com/in/%';
+
+UPDATE salesql_enriched_people
+SET linkedin_slug = NULLIF(LOWER(SUBSTRING_INDEX(SUBSTRING_INDEX(SUBSTRING_INDEX(
+        SUBSTRING_INDEX(LOWER(linkedin_url), 'linkedin.com/in/', -1), '/', 1), '?', 1), '#', 1)), '')
+WHERE linkedin_slug IS NULL
+  AND linkedin_url LIKE '%linkedin.com/in/%';
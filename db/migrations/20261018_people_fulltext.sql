@@ -0,0 +1,10 @@
+-- Search document for GET /api/people?q=... (db/people_repo.search_people).
+-- MATCH(search_doc) AGAINST(... IN BOOLEAN MODE) replaces the LIKE '%q%' scan over 17 columns.
+ALTER TABLE salesql_enriched_people
+    ADD COLUMN search_doc TEXT GENERATED ALWAYS AS (CONCAT_WS(' ',
+        full_name, first_name, last_name, title, headline, person_industry,
+        person_city, person_state, person_country,
+        org_name, org_industry, org_city, org_state, org_country,
+        REPLACE(linkedin_slug, '-', ' '), org_website, org_domain
+    )) STORED,
+    ADD FULLTEXT INDEX ft_sep_search_doc (search_doc);
@@ -0,0 +1,7 @@
+-- Keyset pagination for GET /api/people (db/people_repo.search_people):
+-- each page seeks straight to (sort key, id) instead of skipping OFFSET rows.
+ALTER TABLE salesql_enriched_people
+    ADD INDEX idx_sep_search_created (search_id, created_at, id),
+    ADD INDEX idx_sep_search_name (search_id, full_name, id),
+    ADD INDEX idx_sep_created (created_at, id),
+    ADD INDEX idx_sep_name (full_name, id);
@@ -0,0 +1,6 @@
+-- Canonical query fingerprint (agent/tools/serp_cache.query_fingerprint) so that
+-- equivalent queries collapse onto one search_query_queue row.
+-- Rows enqueued before this migration keep NULL and never match.
+ALTER TABLE search_query_queue
+    ADD COLUMN fingerprint CHAR(64) NULL,
+    ADD UNIQUE INDEX uq_sqq_fingerprint (fingerprint);
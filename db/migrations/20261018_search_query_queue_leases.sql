@@ -0,0 +1,16 @@
+-- Lease-based claiming for search_query_queue (many concurrent workers).
+--   status: pending -> processing (leased) -> done | pending (retry) | dead (max attempts)
+ALTER TABLE search_query_queue
+    MODIFY status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    ADD COLUMN worker_id VARCHAR(128) NULL,
+    ADD COLUMN lease_expires_at DATETIME NULL,
+    ADD COLUMN attempts INT UNSIGNED NOT NULL DEFAULT 0,
+    ADD COLUMN last_error TEXT NULL,
+    ADD COLUMN updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_sqq_status_id (status, id),
+    ADD INDEX idx_sqq_status_lease (status, lease_expires_at);
+
+-- Rows claimed before leases existed can never expire; hand them back to the queue.
+UPDATE search_query_queue
+SET status = 'pending'
+WHERE status = 'processing' AND lease_expires_at IS NULL;
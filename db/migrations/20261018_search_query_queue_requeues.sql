@@ -0,0 +1,5 @@
+-- Times a finished/failed search_query_queue row was re-enqueued. attempts restarts
+-- at 0 on a requeue but the row keeps its id (search_id) and any results saved under
+-- it, so workers de-duplicate against stored links whenever requeues > 0.
+ALTER TABLE search_query_queue
+    ADD COLUMN requeues INT UNSIGNED NOT NULL DEFAULT 0;
@@ -1,11 +1,58 @@
 # db/people_repo.py
+import asyncio
+import base64
 import json
-from typing import List, Optional, Tuple, Dict, Any
-from db.async_mysql import get_db_connection
+import os
+import re
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple, Dict, Any
+import aiomysql
+from db.async_mysql import acquire, get_db_connection
+from services.cache import TTLCache, make_key
 
 _TABLE = "salesql_enriched_people"
 _cached_cols: Optional[List[str]] = None  # preserve order
 
+# FULLTEXT column added by db/migrations/20261018_people_fulltext.sql
+_SEARCH_DOC = "search_doc"
+# Must match the server's innodb_ft_min_token_size; shorter words fall back to LIKE
+FT_MIN_TOKEN_SIZE = int(os.getenv("PEOPLE_FT_MIN_TOKEN_SIZE", "3"))
+# InnoDB's default full-text stopword list: such words are never indexed
+_FT_STOPWORDS = frozenset("""
+a about an are as at be by com de en for from how i in is it la of on or that
+the this to was what when where who will with und www
+""".split())
+_FT_TOKEN = re.compile(r"\w+", re.UNICODE)
+_MATCH_SQL = f"MATCH(p.`{_SEARCH_DOC}`) AGAINST (%s IN BOOLEAN MODE)"
+
+# count_mode="cached": exact totals reused per filter set for this many seconds
+PEOPLE_COUNT_CACHE_TTL = float(os.getenv("PEOPLE_COUNT_CACHE_TTL", "30"))
+_count_cache = TTLCache(maxsize=1024, ttl=PEOPLE_COUNT_CACHE_TTL)
+
+# fields=<preset> -> columns selected (None = every column). id and the sort
+# key are always added so cursors keep working.
+FIELD_PRESETS: Dict[str, Optional[List[str]]] = {
+    "summary": [
+        "id", "search_id", "full_name", "title", "headline", "image_url", "linkedin_url",
+        "person_city", "person_country", "org_name", "org_domain", "created_at",
+    ],
+    "contact": [
+        "id", "search_id", "full_name", "title", "linkedin_url",
+        "person_city", "person_country", "org_name", "org_website", "org_domain",
+        "emails_json", "phones_json", "created_at",
+    ],
+    "full": None,
+}
+_JSON_COLUMNS = ("emails_json", "phones_json", "raw_json")
+
+# Export: rows pulled from the server-side cursor per round trip, and how long
+# MySQL waits on a slow client before dropping the stream
+EXPORT_FETCH_SIZE = int(os.getenv("PEOPLE_EXPORT_FETCH_SIZE", "1000"))
+EXPORT_NET_WRITE_TIMEOUT = int(os.getenv("PEOPLE_EXPORT_NET_WRITE_TIMEOUT", "600"))
+# Exports stream over their own connections (not the shared pool); at most this many at once
+EXPORT_MAX_CONCURRENCY = int(os.getenv("PEOPLE_EXPORT_MAX_CONCURRENCY", "4"))
+_export_slots = asyncio.Semaphore(max(1, EXPORT_MAX_CONCURRENCY))
+
 
 async def _get_columns() -> List[str]:
     """
@@ -22,7 +69,7 @@ async def _get_columns() -> List[str]:
         WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
         ORDER BY ORDINAL_POSITION
     """
-    async with await get_db_connection() as conn:
+    async with acquire() as conn:
         async with conn.cursor() as cur:
             await cur.execute(sql, (_TABLE,))
             _cached_cols = [row[0] for row in await cur.fetchall()]
@@ -34,21 +81,57 @@ def _build_like_clause(cols: List[str]) -> str:
     return "(" + " OR ".join([f"p.`{c}` LIKE %s" for c in cols]) + ")"
 
 
-async def search_people(
-    search_id: Optional[int],
-    q: Optional[str],
-    tech_stack: List[str],   # kept for compatibility; used only if columns exist
-    locations: List[str],    # kept for compatibility; used only if columns exist
-    sort: str,
-    limit: int,
-    offset: int,
-) -> Tuple[List[Dict[str, Any]], int]:
-    cols = await _get_columns()
+def _fulltext_query(q: str) -> Optional[str]:
+    """
+    'Python dev, Pune' -> '+python* +dev* +pune*' (every word required, prefix match).
+    None when any word is too short or a stopword: the index can't answer it,
+    so the caller falls back to LIKE.
+    """
+    tokens = [t.lower() for t in _FT_TOKEN.findall(q)]
+    if not tokens:
+        return None
+    if any(len(t) < FT_MIN_TOKEN_SIZE or t in _FT_STOPWORDS for t in tokens):
+        return None
+    return " ".join(f"+{t}*" for t in dict.fromkeys(tokens))
+
+
+class InvalidCursor(ValueError):
+    """The cursor token is malformed or was issued for another filter/sort."""
+
 
-    # SELECT all columns dynamically
-    select_sql = ", ".join([f"p.`{c}`" for c in cols])
+def _filters_key(search_id, q, tech_stack, locations, sort) -> str:
+    return make_key(search_id, q or "", sorted(tech_stack), sorted(locations), sort)[:16]
 
-    # WHERE
+
+def _encode_cursor(filters_key: str, value: Any, last_id: int) -> str:
+    is_dt = isinstance(value, datetime)
+    body = {"f": filters_key, "v": value.isoformat() if is_dt else value, "dt": is_dt, "id": last_id}
+    raw = json.dumps(body, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(token: str, filters_key: str) -> Tuple[Any, int]:
+    try:
+        body = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        value = body["v"]
+        if body.get("dt") and value is not None:
+            value = datetime.fromisoformat(value)
+        last_id = int(body["id"])
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
+    if body.get("f") != filters_key:
+        raise InvalidCursor("Cursor does not match these filters/sort")
+    return value, last_id
+
+
+def _build_where(
+    cols: List[str],
+    search_id: Optional[int],
+    q: Optional[str],
+    tech_stack: List[str],
+    locations: List[str],
+) -> Tuple[List[str], List[Any], Optional[str]]:
+    """WHERE parts, their params, and the full-text query (None if LIKE/no q)."""
     where = ["1=1"]
     params: List[Any] = []
 
@@ -64,7 +147,11 @@ async def search_people(
         "linkedin_url", "org_website", "org_domain"
     ]
     q_targets = [c for c in q_targets_preference if c in cols]
-    if q and q_targets:
+    ft_query = _fulltext_query(q) if q and _SEARCH_DOC in cols else None
+    if ft_query:
+        where.append(_MATCH_SQL)
+        params.append(ft_query)
+    elif q and q_targets:
         where.append(_build_like_clause(q_targets))
         like = f"%{q}%"
         params.extend([like] * len(q_targets))
@@ -88,22 +175,138 @@ async def search_people(
         where.append(clause)
         params.extend(p)
 
-    where_sql = " AND ".join(where)
+    return where, params, ft_query
+
 
-    # ORDER
+def _sort_key(cols: List[str], sort: str, ft_query: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(column, direction) the page is ordered by, id breaking ties; None = relevance."""
+    if sort == "relevance" and ft_query:
+        return None
     if sort == "name" and "full_name" in cols:
-        order_sql = "p.`full_name` ASC"
-    elif "created_at" in cols:
-        order_sql = "p.`created_at` DESC"
-    elif "id" in cols:
-        order_sql = "p.`id` DESC"
+        return "full_name", "ASC"
+    if "created_at" in cols:
+        return "created_at", "DESC"
+    return "id", "DESC"
+
+
+def _keyset_clause(col: str, direction: str, value: Any, last_id: int) -> Tuple[str, List[Any]]:
+    """Rows strictly after (value, last_id) in ORDER BY col <direction>, id <direction>."""
+    c = f"p.`{col}`"
+    if col == "id":
+        return ("p.`id` > %s" if direction == "ASC" else "p.`id` < %s"), [last_id]
+    if direction == "ASC":
+        # MySQL sorts NULLs first ascending
+        if value is None:
+            return f"(({c} IS NULL AND p.`id` > %s) OR {c} IS NOT NULL)", [last_id]
+        return f"({c} > %s OR ({c} = %s AND p.`id` > %s))", [value, value, last_id]
+    # ... and last descending
+    if value is None:
+        return f"({c} IS NULL AND p.`id` < %s)", [last_id]
+    return f"({c} < %s OR ({c} = %s AND p.`id` < %s) OR {c} IS NULL)", [value, value, last_id]
+
+
+async def _count(cur, where_sql: str, params: List[Any], count_mode: str, cache_key: str) -> Optional[int]:
+    if count_mode == "none":
+        return None
+    if count_mode == "approx":
+        # Optimizer row estimate: no scan, but can be far off for selective filters
+        await cur.execute(f"EXPLAIN SELECT 1 FROM `{_TABLE}` p WHERE {where_sql}", params)
+        names = [c[0] for c in cur.description]
+        row = await cur.fetchone()
+        return int(row[names.index("rows")] or 0) if row else 0
+    if count_mode == "cached":
+        cached = _count_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    await cur.execute(f"SELECT COUNT(*) FROM `{_TABLE}` p WHERE {where_sql}", params)
+    row = await cur.fetchone()
+    total = int(row[0]) if row and row[0] is not None else 0
+    _count_cache.set(cache_key, total)
+    return total
+
+
+def _select_columns(cols: List[str], fields: str, key: Optional[Tuple[str, str]]) -> List[str]:
+    if fields not in FIELD_PRESETS:
+        raise ValueError(f"Unknown fields preset: {fields}")
+    wanted = FIELD_PRESETS[fields]
+    if wanted is None:
+        return [c for c in cols if c != _SEARCH_DOC]
+    wanted = list(wanted)
+    for extra in ("id", key[0] if key else None):
+        if extra and extra not in wanted:
+            wanted.append(extra)
+    return [c for c in wanted if c in cols]
+
+
+def _parse_json(val):
+    if val is None:
+        return None
+    if isinstance(val, (dict, list)):
+        return val
+    try:
+        return json.loads(val)
+    except Exception:
+        return val  # leave as-is if not valid JSON
+
+
+async def search_people(
+    search_id: Optional[int],
+    q: Optional[str],
+    tech_stack: List[str],   # kept for compatibility; used only if columns exist
+    locations: List[str],    # kept for compatibility; used only if columns exist
+    sort: str,
+    limit: int,
+    offset: int,
+    cursor: Optional[str] = None,
+    count_mode: str = "exact",
+    fields: str = "full",
+) -> Tuple[List[Dict[str, Any]], Optional[int], Optional[str]]:
+    """
+    Returns (rows, total, next_cursor).
+
+    With `cursor` (the next_cursor of the previous page) the page starts right
+    after the last row seen, via the sort key + id, so every page costs the
+    same; `offset` is ignored. Without it, LIMIT/OFFSET as before. next_cursor
+    is None on the last page and for sort=relevance (offset only).
+
+    count_mode: "exact" (COUNT(*)), "cached" (exact, reused per filter for
+    PEOPLE_COUNT_CACHE_TTL seconds), "approx" (optimizer estimate), "none".
+    `fields` names a FIELD_PRESETS entry; only its columns are read, and JSON
+    columns are decoded only when selected.
+    Raises InvalidCursor for a bad or mismatched cursor.
+    """
+    cols = await _get_columns()
+
+    where, params, ft_query = _build_where(cols, search_id, q, tech_stack, locations)
+    filters_key = _filters_key(search_id, q, tech_stack, locations, sort)
+    count_where_sql = " AND ".join(where)
+    count_params = list(params)
+
+    # ORDER (+ keyset position)
+    key = _sort_key(cols, sort, ft_query)
+    order_params: List[Any] = []
+    if key is None:
+        order_sql = f"{_MATCH_SQL} DESC, p.`id` DESC"
+        order_params.append(ft_query)
     else:
-        order_sql = "1"
+        col, direction = key
+        order_sql = f"p.`{col}` {direction}" + ("" if col == "id" else f", p.`id` {direction}")
+
+    # SELECT the preset's columns (the derived search document stays server-side)
+    select_sql = ", ".join(f"p.`{c}`" for c in _select_columns(cols, fields, key))
+
+    if cursor:
+        if key is None:
+            raise InvalidCursor("sort=relevance pages by offset only")
+        value, last_id = _decode_cursor(cursor, filters_key)
+        clause, clause_params = _keyset_clause(key[0], key[1], value, last_id)
+        where.append(clause)
+        params.extend(clause_params)
+        offset = 0
 
-    # COUNT
-    count_sql = f"SELECT COUNT(*) FROM `{_TABLE}` p WHERE {where_sql}"
+    where_sql = " AND ".join(where)
 
-    # DATA
+    # DATA (one extra row tells us whether there is a next page)
     data_sql = f"""
         SELECT {select_sql}
         FROM `{_TABLE}` p
@@ -113,35 +316,83 @@ async def search_people(
     """
 
     # Execute
-    async with await get_db_connection() as conn:
+    async with acquire() as conn:
         async with conn.cursor() as cur:
-            await cur.execute(count_sql, params)
-            row = await cur.fetchone()
-            total = int(row[0]) if row and row[0] is not None else 0
+            total = await _count(
+                cur, count_where_sql, count_params, count_mode,
+                _filters_key(search_id, q, tech_stack, locations, "count"),
+            )
 
-            dparams = params + [limit, offset]
+            dparams = params + order_params + [limit + 1, offset]
             await cur.execute(data_sql, dparams)
             rows = await cur.fetchall()
             colnames = [c[0] for c in cur.description]
             raw = [dict(zip(colnames, r)) for r in rows]
 
-    # Parse JSON columns if present
-    def _parse_json(val):
-        if val is None:
-            return None
-        if isinstance(val, (dict, list)):
-            return val
-        try:
-            return json.loads(val)
-        except Exception:
-            return val  # leave as-is if not valid JSON
+    next_cursor = None
+    if len(raw) > limit:
+        raw = raw[:limit]
+        if key is not None:
+            last = raw[-1]
+            next_cursor = _encode_cursor(filters_key, last.get(key[0]), last["id"])
 
+    # Parse JSON columns if present
+    json_cols = [c for c in _JSON_COLUMNS if raw and c in raw[0]]
     for r in raw:
-        if "emails_json" in r:
-            r["emails_json"] = _parse_json(r["emails_json"])
-        if "phones_json" in r:
-            r["phones_json"] = _parse_json(r["phones_json"])
-        if "raw_json" in r:
-            r["raw_json"] = _parse_json(r["raw_json"])
-
-    return raw, total
+        for c in json_cols:
+            r[c] = _parse_json(r[c])
+
+    return raw, total, next_cursor
+
+
+async def iter_people(
+    search_id: Optional[int],
+    q: Optional[str],
+    tech_stack: List[str],
+    locations: List[str],
+    fields: str = "full",
+    after_id: Optional[int] = None,
+    decode_json: bool = True,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[Tuple[List[str], List[Dict[str, Any]]]]:
+    """
+    Stream every matching row in id order as (column names, batch of rows),
+    read through an unbuffered server-side cursor so memory stays flat.
+    `after_id` resumes after the last id a previous export delivered.
+    Runs on a dedicated connection (up to PEOPLE_EXPORT_MAX_CONCURRENCY at a
+    time), so slow clients never hold pool connections and the session
+    timeout never leaks into the pool; it is closed when the stream ends.
+    """
+    cols = await _get_columns()
+    where, params, _ = _build_where(cols, search_id, q, tech_stack, locations)
+    if after_id is not None:
+        where.append("p.`id` > %s")
+        params.append(after_id)
+    names = _select_columns(cols, fields, ("id", "ASC"))
+    select_sql = ", ".join(f"p.`{c}`" for c in names)
+    json_cols = [c for c in _JSON_COLUMNS if c in names] if decode_json else []
+    sql = f"""
+        SELECT {select_sql}
+        FROM `{_TABLE}` p
+        WHERE {" AND ".join(where)}
+        ORDER BY p.`id` ASC
+    """
+
+    async with _export_slots:
+        conn = await get_db_connection()
+        try:
+            cur = await conn.cursor(aiomysql.SSCursor)
+            await cur.execute("SET SESSION net_write_timeout = %s", (EXPORT_NET_WRITE_TIMEOUT,))
+            await cur.execute(sql, params)
+            while True:
+                rows = await cur.fetchmany(batch_size or EXPORT_FETCH_SIZE)
+                if not rows:
+                    break
+                batch = [dict(zip(names, r)) for r in rows]
+                for r in batch:
+                    for c in json_cols:
+                        r[c] = _parse_json(r[c])
+                yield names, batch
+        finally:
+            # Dropping the socket also skips draining unread rows if the client went away
+            conn.close()
@@ -1,50 +1,56 @@
 # db/salesql_results.py
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Sequence, Set, Tuple
 import json
+import os
+from datetime import datetime, timezone
 import aiomysql
-from db.async_mysql import get_db_connection
+from db.async_mysql import acquire
+from db.search_versions import bump_search_versions
+from services.salesql_client import linkedin_slug, profile_url
 
 TABLE_GOOGLE_RESULTS = "google_search_results"
 TABLE_SALESQL_RESULTS = "salesql_enriched_people"
-
-
-def _looks_like_profile(url: str) -> bool:
-    u = (url or "").lower()
-    return "linkedin.com/in" in u
+TABLE_SALESQL_CACHE = "salesql_person_cache"
 
 
 async def get_linkedin_urls_for_search_id(search_id: int) -> List[Dict[str, Any]]:
-    conn = await get_db_connection()
+    """
+    One row per distinct profile found for search_id:
+      {"id": <first google_search_results.id>, "link": <canonical URL>, "slug": ...}
+    Answered from the (search_id, linkedin_slug) index alone.
+    """
     rows: List[Dict[str, Any]] = []
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute(
-            f"""
-            SELECT id, link
-            FROM {TABLE_GOOGLE_RESULTS}
-            WHERE search_id = %s
-              AND link LIKE '%%linkedin.com/in%%'
-            """,
-            (search_id,),
-        )
-        for r in await cursor.fetchall():
-            if _looks_like_profile(r.get("link")):
-                rows.append({"id": r["id"], "link": r["link"]})
-    conn.close()
+    async with acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(
+                f"""
+                SELECT MIN(id) AS id, linkedin_slug
+                FROM {TABLE_GOOGLE_RESULTS}
+                WHERE search_id = %s
+                  AND linkedin_slug IS NOT NULL
+                GROUP BY linkedin_slug
+                ORDER BY id
+                """,
+                (search_id,),
+            )
+            for r in await cursor.fetchall():
+                slug = r["linkedin_slug"]
+                rows.append({"id": r["id"], "link": profile_url(slug), "slug": slug})
     return rows
 
 
-async def get_existing_linkedin_urls(search_id: int) -> Set[str]:
-    conn = await get_db_connection()
-    urls: Set[str] = set()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute(
-            f"SELECT linkedin_url FROM {TABLE_SALESQL_RESULTS} WHERE search_id = %s",
-            (search_id,),
-        )
-        for r in await cursor.fetchall():
-            urls.add(r["linkedin_url"])
-    conn.close()
-    return urls
+async def get_existing_linkedin_slugs(search_id: int) -> Set[str]:
+    """Profile slugs already enriched for search_id."""
+    async with acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                f"""
+                SELECT DISTINCT linkedin_slug FROM {TABLE_SALESQL_RESULTS}
+                WHERE search_id = %s AND linkedin_slug IS NOT NULL
+                """,
+                (search_id,),
+            )
+            return {r[0] for r in await cursor.fetchall()}
 
 
 def _get_nested(d: Dict[str, Any], *path: str) -> Optional[Any]:
@@ -96,15 +102,39 @@ def _to_int(v: Any) -> Optional[int]:
     return None
 
 
-async def save_salesql_person(
+SALESQL_COLUMNS = (
+    "search_id", "google_result_id", "linkedin_url", "linkedin_slug",
+    "person_uuid", "full_name", "first_name", "last_name",
+    "title", "headline", "person_industry", "image_url",
+    "person_city", "person_state", "person_country_code", "person_country", "person_region",
+    "org_uuid", "org_name", "org_website", "org_domain", "org_linkedin_url", "org_employees", "org_industry",
+    "org_city", "org_state", "org_country_code", "org_country", "org_region",
+    "emails_json", "phones_json", "raw_json",
+)
+
+# Key columns are inserted but never overwritten on duplicate
+_UPSERT_KEY_COLUMNS = ("search_id", "google_result_id", "linkedin_url", "linkedin_slug")
+
+# ---- SQL assembled once from the column list ----
+_UPSERT_SQL = (
+    f"INSERT INTO {TABLE_SALESQL_RESULTS} ({', '.join(SALESQL_COLUMNS)}) "
+    f"VALUES ({', '.join(['%s'] * len(SALESQL_COLUMNS))}) "
+    "ON DUPLICATE KEY UPDATE "
+    + ", ".join(f"{c} = VALUES({c})" for c in SALESQL_COLUMNS if c not in _UPSERT_KEY_COLUMNS)
+)
+
+UPSERT_CHUNK_SIZE = int(os.getenv("SALESQL_UPSERT_CHUNK_SIZE", "200"))
+
+
+def build_salesql_row(
     search_id: int,
     source_row_id: Optional[int],
     linkedin_url: str,
     payload: Dict[str, Any],
-) -> None:
+) -> Tuple[Any, ...]:
     """
-    Insert/update a SalesQL person row mapped to SalesQL schema.
-    This function sanitizes non-scalar fields to avoid MySQL param errors.
+    Map a SalesQL payload to a parameter tuple ordered like SALESQL_COLUMNS.
+    Pure function: non-scalar fields are sanitized to avoid MySQL param errors.
     """
     # ---- sanitize & map ----
     person_uuid = _scalar_or_none(payload.get("uuid"))
@@ -140,60 +170,11 @@ async def save_salesql_person(
     emails = payload.get("emails")
     phones = payload.get("phones")
 
-    # ---- SQL assembled safely in one f-string ----
-    sql_insert = f"""
-INSERT INTO {TABLE_SALESQL_RESULTS}
-( search_id, google_result_id, linkedin_url,
-  person_uuid, full_name, first_name, last_name,
-  title, headline, person_industry, image_url,
-  person_city, person_state, person_country_code, person_country, person_region,
-  org_uuid, org_name, org_website, org_domain, org_linkedin_url, org_employees, org_industry,
-  org_city, org_state, org_country_code, org_country, org_region,
-  emails_json, phones_json, raw_json )
-VALUES (
-  %s, %s, %s,
-  %s, %s, %s, %s,
-  %s, %s, %s, %s,
-  %s, %s, %s, %s, %s,
-  %s, %s, %s, %s, %s, %s, %s,
-  %s, %s, %s, %s, %s,
-  %s, %s, %s
-)
-ON DUPLICATE KEY UPDATE
-  person_uuid = VALUES(person_uuid),
-  full_name = VALUES(full_name),
-  first_name = VALUES(first_name),
-  last_name = VALUES(last_name),
-  title = VALUES(title),
-  headline = VALUES(headline),
-  person_industry = VALUES(person_industry),
-  image_url = VALUES(image_url),
-  person_city = VALUES(person_city),
-  person_state = VALUES(person_state),
-  person_country_code = VALUES(person_country_code),
-  person_country = VALUES(person_country),
-  person_region = VALUES(person_region),
-  org_uuid = VALUES(org_uuid),
-  org_name = VALUES(org_name),
-  org_website = VALUES(org_website),
-  org_domain = VALUES(org_domain),
-  org_linkedin_url = VALUES(org_linkedin_url),
-  org_employees = VALUES(org_employees),
-  org_industry = VALUES(org_industry),
-  org_city = VALUES(org_city),
-  org_state = VALUES(org_state),
-  org_country_code = VALUES(org_country_code),
-  org_country = VALUES(org_country),
-  org_region = VALUES(org_region),
-  emails_json = VALUES(emails_json),
-  phones_json = VALUES(phones_json),
-  raw_json = VALUES(raw_json)
-""".strip()
-
-    params = (
+    return (
         int(search_id),
         (None if source_row_id is None else int(source_row_id)),
         str(linkedin_url),
+        linkedin_slug(linkedin_url),
 
         person_uuid, full_name, first_name, last_name,
         title, headline, person_industry, image_url,
@@ -208,7 +189,105 @@ ON DUPLICATE KEY UPDATE
         json.dumps(payload, ensure_ascii=False),
     )
 
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        await cursor.execute(sql_insert, params)
-    conn.close()
+
+async def save_salesql_people(rows: Sequence[Tuple[Any, ...]]) -> int:
+    """
+    Upsert many rows built by build_salesql_row() using multi-row
+    INSERT ... ON DUPLICATE KEY UPDATE statements of UPSERT_CHUNK_SIZE rows.
+    Bumps the data version of every search_id written (db/search_versions.py).
+    """
+    if not rows:
+        return 0
+    try:
+        async with acquire() as conn:
+            async with conn.cursor() as cursor:
+                for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+                    await cursor.executemany(_UPSERT_SQL, list(rows[i:i + UPSERT_CHUNK_SIZE]))
+    finally:
+        # Even a failed chunk may have committed earlier ones
+        await bump_search_versions(row[0] for row in rows)
+    return len(rows)
+
+
+async def save_salesql_person(
+    search_id: int,
+    source_row_id: Optional[int],
+    linkedin_url: str,
+    payload: Dict[str, Any],
+) -> None:
+    """
+    Insert/update a SalesQL person row mapped to SalesQL schema.
+    This function sanitizes non-scalar fields to avoid MySQL param errors.
+    """
+    params = build_salesql_row(search_id, source_row_id, linkedin_url, payload)
+    async with acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(_UPSERT_SQL, params)
+    await bump_search_versions([search_id])
+
+
+async def get_cached_people(
+    canonical_urls: Sequence[str],
+    max_age_seconds: int,
+    not_found_max_age_seconds: int,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fresh entries of the global enrichment store, keyed by canonical URL.
+    Each value is the SalesQL payload; "not found" entries come back as
+    {"_not_found": True} and use the (usually shorter) not-found max age.
+    """
+    urls = list(dict.fromkeys(canonical_urls))
+    found: Dict[str, Dict[str, Any]] = {}
+    if not urls:
+        return found
+    async with acquire() as conn:
+        async with conn.cursor() as cursor:
+            for i in range(0, len(urls), UPSERT_CHUNK_SIZE):
+                chunk = urls[i:i + UPSERT_CHUNK_SIZE]
+                in_clause = ",".join(["%s"] * len(chunk))
+                await cursor.execute(
+                    f"""
+                    SELECT canonical_url, not_found, payload_json
+                    FROM {TABLE_SALESQL_CACHE}
+                    WHERE canonical_url IN ({in_clause})
+                      AND fetched_at > UTC_TIMESTAMP() - INTERVAL
+                          (CASE WHEN not_found THEN %s ELSE %s END) SECOND
+                    """,
+                    (*chunk, int(not_found_max_age_seconds), int(max_age_seconds)),
+                )
+                for url, not_found, payload_json in await cursor.fetchall():
+                    if not_found:
+                        found[url] = {"_not_found": True}
+                    elif payload_json is not None:
+                        found[url] = json.loads(payload_json)
+    return found
+
+
+async def store_cached_people(entries: Sequence[Tuple[str, Dict[str, Any]]]) -> int:
+    """Upsert (canonical_url, payload) pairs into the global enrichment store."""
+    if not entries:
+        return 0
+    # Bound as a parameter (not UTC_TIMESTAMP()) so executemany can batch rows
+    fetched_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    params = [
+        (
+            url,
+            1 if payload.get("_not_found") else 0,
+            None if payload.get("_not_found") else json.dumps(payload, ensure_ascii=False),
+            fetched_at,
+        )
+        for url, payload in entries
+    ]
+    sql = f"""
+INSERT INTO {TABLE_SALESQL_CACHE} (canonical_url, not_found, payload_json, fetched_at)
+VALUES (%s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+  not_found = VALUES(not_found),
+  payload_json = VALUES(payload_json),
+  fetched_at = VALUES(fetched_at)
+""".strip()
+    async with acquire() as conn:
+        async with conn.cursor() as cursor:
+            for i in range(0, len(params), UPSERT_CHUNK_SIZE):
+                await cursor.executemany(sql, params[i:i + UPSERT_CHUNK_SIZE])
+    return len(params)
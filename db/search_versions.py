@@ -0,0 +1,75 @@
+# db/search_versions.py
+"""
+Per-search_id data versions for response caching (GET /api/people).
+
+Every enrichment write bumps the version of the search_ids it touched, plus
+GLOBAL_SEARCH_ID (0) for views that are not filtered by search. Versions live
+in the `search_versions` table so writes from worker processes invalidate the
+API process too; readers keep them in memory and re-read a row at most every
+SEARCH_VERSION_REFRESH_SECONDS. With CACHE_BACKEND=memory (or if the table
+can't be reached) versions are per process only.
+"""
+import os
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from db.async_mysql import acquire
+from services.cache import CACHE_BACKEND
+
+TABLE_SEARCH_VERSIONS = "search_versions"
+GLOBAL_SEARCH_ID = 0
+
+SEARCH_VERSION_REFRESH_SECONDS = float(os.getenv("SEARCH_VERSION_REFRESH_SECONDS", "2"))
+
+# search_id -> (version, monotonic time it was last read from / written to the DB)
+_versions: Dict[int, Tuple[int, float]] = {}
+
+
+async def bump_search_versions(search_ids: Iterable[Optional[int]]) -> None:
+    """Mark the data of `search_ids` (and the global view) as changed. Never raises."""
+    ids = {int(s) for s in search_ids if s is not None}
+    ids.add(GLOBAL_SEARCH_ID)
+    now = time.monotonic()
+    # Local first, so this process never serves a stale page even if the DB is down
+    for sid in ids:
+        version, _ = _versions.get(sid, (0, 0.0))
+        _versions[sid] = (version + 1, now)
+    if CACHE_BACKEND != "mysql":
+        return
+    try:
+        async with acquire() as conn:
+            async with conn.cursor() as cur:
+                for sid in sorted(ids):
+                    # LAST_INSERT_ID(expr) returns the new version without a second read
+                    await cur.execute(
+                        f"""
+                        INSERT INTO {TABLE_SEARCH_VERSIONS} (search_id, version)
+                        VALUES (%s, LAST_INSERT_ID(1))
+                        ON DUPLICATE KEY UPDATE version = LAST_INSERT_ID(version + 1)
+                        """,
+                        (sid,),
+                    )
+                    _versions[sid] = (max(int(cur.lastrowid or 0), _versions[sid][0]), now)
+    except Exception as e:
+        print(f"[SearchVersions] bump failed for {sorted(ids)}: {e}")
+
+
+async def get_search_version(search_id: Optional[int]) -> int:
+    """Current version of one search_id (None = the global view)."""
+    sid = GLOBAL_SEARCH_ID if search_id is None else int(search_id)
+    version, checked = _versions.get(sid, (0, 0.0))
+    if CACHE_BACKEND != "mysql" or time.monotonic() - checked < SEARCH_VERSION_REFRESH_SECONDS:
+        return version
+    try:
+        async with acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    f"SELECT version FROM {TABLE_SEARCH_VERSIONS} WHERE search_id = %s",
+                    (sid,),
+                )
+                row = await cur.fetchone()
+        version = max(version, int(row[0]) if row else 0)
+    except Exception as e:
+        print(f"[SearchVersions] read failed for search_id={sid}: {e}")
+    _versions[sid] = (version, time.monotonic())
+    return version
@@ -1,4 +1,6 @@
 # main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from pydantic import BaseModel
 from dotenv import load_dotenv
@@ -6,12 +8,34 @@ from dotenv import load_dotenv
 from agent.agent_base import BaseAgent
 from api.salesql_routes import router as salesql_router  # <-- NEW
 from api.people_routes import router as people_router
+from db.async_mysql import init_pool, close_pool, get_pool_stats
+from db.batch_writer import close_all_writers
+from services.http_clients import init_http_clients, close_http_clients
+from services.cache import cache_stats
+from services.providers import provider_stats
+from services.llm_client import close_openai_client
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared resources live for the whole process, not per request
+    await init_pool()
+    init_http_clients()
+    try:
+        yield
+    finally:
+        await close_all_writers()
+        await close_openai_client()
+        await close_http_clients()
+        await close_pool()
+
+
 app = FastAPI(
     title="Agent Vikram API",
     version="0.2.0",
+    lifespan=lifespan,
     openapi_tags=[
         {"name": "SalesQL", "description": "Enrich LinkedIn profiles using SalesQL"},
     ],
@@ -22,6 +46,7 @@ app.include_router(people_router, prefix="/api")
 class AgentInput(BaseModel):
     user_input: str
     max_results_per_query: int = 20  # keep configurable (1..100 depending on plan)
+    enrich_inline: bool = False  # enrich profiles via SalesQL while the searches run
 
 @app.post("/agentic-query-generator")
 async def agentic_query_generator(payload: AgentInput):
@@ -29,6 +54,7 @@ async def agentic_query_generator(payload: AgentInput):
     result = await agent.run(
         user_input=payload.user_input,
         max_results_per_query=payload.max_results_per_query,
+        enrich_inline=payload.enrich_inline,
     )
     return result
 
@@ -38,3 +64,7 @@ app.include_router(salesql_router)
 @app.get("/health")
 def health():
     return {"ok": True}
+
+@app.get("/metrics")
+def metrics():
+    return {"db_pool": get_pool_stats(), "caches": cache_stats(), "providers": provider_stats()}
@@ -50,8 +50,11 @@ class PeopleSearchResponse(BaseModel):
     search_id: Optional[int] = None
     tech_stack: List[str] = []
     locations: List[str] = []
-    sort: Literal["recent", "name"] = "recent"
+    sort: Literal["recent", "name", "relevance"] = "recent"
     limit: int
     offset: int
-    count: int
+    count: Optional[int] = None  # None when count_mode="none"
+    count_mode: Literal["exact", "cached", "approx", "none"] = "exact"
+    next_cursor: Optional[str] = None
+    fields: Literal["summary", "contact", "full"] = "full"
     items: List[PeopleItem]
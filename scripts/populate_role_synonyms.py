@@ -0,0 +1,65 @@
+# scripts/populate_role_synonyms.py
+# Offline: ask the LLM for LinkedIn role titles per technology and merge them
+# into the JSON table read by agent/query_builder.py.
+#
+#   python scripts/populate_role_synonyms.py "Elixir" "Snowflake" "dbt"
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from agent.query_builder import ROLE_SYNONYMS_PATH
+from services.llm_client import chat_completion, close_openai_client
+
+SYSTEM_PROMPT = (
+    "You help build Google X-ray searches for LinkedIn profiles. "
+    "For the given technology, list up to 4 job titles that people with that skill "
+    "commonly use on their LinkedIn profile, most common first. "
+    'Return only a JSON array of strings, e.g. ["Python developer", "Python engineer"].'
+)
+
+
+async def fetch_terms(tech: str) -> list[str]:
+    output = await chat_completion(
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": tech},
+        ],
+    )
+    terms = json.loads(output.strip().strip("`").strip())
+    return [str(t).strip() for t in terms if str(t).strip()][:4]
+
+
+async def main(techs: list[str]) -> None:
+    try:
+        with open(ROLE_SYNONYMS_PATH, encoding="utf-8") as fh:
+            table = json.load(fh)
+    except FileNotFoundError:
+        table = {}
+
+    try:
+        results = await asyncio.gather(*(fetch_terms(t) for t in techs), return_exceptions=True)
+    finally:
+        await close_openai_client()
+
+    for tech, terms in zip(techs, results):
+        if isinstance(terms, Exception) or not terms:
+            print(f"{tech}: skipped ({terms})")
+            continue
+        table[tech] = terms
+        print(f"{tech}: {terms}")
+
+    os.makedirs(os.path.dirname(ROLE_SYNONYMS_PATH), exist_ok=True)
+    with open(ROLE_SYNONYMS_PATH, "w", encoding="utf-8") as fh:
+        json.dump(table, fh, indent=2, ensure_ascii=False, sort_keys=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python scripts/populate_role_synonyms.py <tech> [<tech> ...]")
+    asyncio.run(main(sys.argv[1:]))
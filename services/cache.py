@@ -0,0 +1,189 @@
+# services/cache.py
+"""
+Small caching building blocks shared by the provider tools:
+
+  TTLCache         in-process LRU with per-entry expiry
+  PersistentCache  TTLCache in front of the MySQL `cache_entries` table
+
+Values must be JSON-serializable. Cached objects are shared between callers,
+so treat whatever get() returns as read-only.
+"""
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from db.async_mysql import acquire
+
+# "mysql" (memory LRU + cache_entries table) or "memory" (LRU only)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "mysql")
+
+# Expired cache_entries rows deleted per statement by purge_expired_entries()
+CACHE_PURGE_BATCH = int(os.getenv("CACHE_PURGE_BATCH", "1000"))
+
+_MISSING = object()
+_registry: Dict[str, "PersistentCache"] = {}
+
+
+def make_key(*parts: Any) -> str:
+    """Stable sha256 hex key from arbitrary JSON-able parts."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """LRU dict with a max size and per-entry expiry (monotonic clock)."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600) -> None:
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.stats["misses"] += 1
+            return default
+        self._data.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def pop(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class PersistentCache:
+    """
+    Read-through cache: memory LRU first, then the `cache_entries` row for
+    (namespace, key). DB failures are counted and treated as misses so a cache
+    outage never breaks the caller.
+    """
+
+    def __init__(self, namespace: str, ttl: float, maxsize: int = 1024, backend: Optional[str] = None) -> None:
+        self.namespace = namespace
+        self.ttl = ttl
+        self.backend = backend or CACHE_BACKEND
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.stats = {"memory_hits": 0, "store_hits": 0, "misses": 0, "writes": 0, "errors": 0}
+        _registry[namespace] = self
+
+    async def get(self, key: str) -> Any:
+        """Cached value or None."""
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            self.stats["memory_hits"] += 1
+            return value
+
+        if self.backend == "mysql":
+            try:
+                async with acquire() as conn:
+                    async with conn.cursor() as cur:
+                        await cur.execute(
+                            "SELECT value_json, TIMESTAMPDIFF(SECOND, UTC_TIMESTAMP(), expires_at) "
+                            "FROM cache_entries "
+                            "WHERE namespace = %s AND cache_key = %s AND expires_at > UTC_TIMESTAMP()",
+                            (self.namespace, key),
+                        )
+                        row = await cur.fetchone()
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"[Cache:{self.namespace}] read failed: {e}")
+                row = None
+            if row is not None:
+                value = json.loads(row[0])
+                self.memory.set(key, value, ttl=max(1, int(row[1] or 0)))
+                self.stats["store_hits"] += 1
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self.memory.set(key, value, ttl=ttl)
+        self.stats["writes"] += 1
+        if self.backend != "mysql":
+            return
+        try:
+            async with acquire() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(
+                        """
+                        INSERT INTO cache_entries (namespace, cache_key, value_json, expires_at)
+                        VALUES (%s, %s, %s, UTC_TIMESTAMP() + INTERVAL %s SECOND)
+                        ON DUPLICATE KEY UPDATE
+                          value_json = VALUES(value_json),
+                          expires_at = VALUES(expires_at)
+                        """,
+                        (self.namespace, key, json.dumps(value, ensure_ascii=False), int(ttl)),
+                    )
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"[Cache:{self.namespace}] write failed: {e}")
+
+    async def purge_expired(self) -> int:
+        """Delete expired rows of this namespace from the store."""
+        if self.backend != "mysql":
+            return 0
+        async with acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "DELETE FROM cache_entries WHERE namespace = %s AND expires_at <= UTC_TIMESTAMP()",
+                    (self.namespace,),
+                )
+                return cur.rowcount
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.stats["memory_hits"] + self.stats["store_hits"] + self.stats["misses"]
+        hits = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "backend": self.backend,
+        }
+
+
+async def purge_expired_entries(batch: Optional[int] = None) -> int:
+    """
+    Delete expired rows of every namespace from `cache_entries`, `batch` rows
+    per statement so a large backlog never holds long locks. Returns rows deleted.
+    Called periodically by the continuous search worker.
+    """
+    if CACHE_BACKEND != "mysql":
+        return 0
+    batch = max(1, batch or CACHE_PURGE_BATCH)
+    deleted = 0
+    async with acquire() as conn:
+        async with conn.cursor() as cur:
+            while True:
+                await cur.execute(
+                    "DELETE FROM cache_entries WHERE expires_at <= UTC_TIMESTAMP() LIMIT %s",
+                    (batch,),
+                )
+                deleted += cur.rowcount
+                if cur.rowcount < batch:
+                    return deleted
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Counters for every PersistentCache created in this process."""
+    return {name: cache.snapshot() for name, cache in _registry.items()}
@@ -0,0 +1,160 @@
+# services/enrichment.py
+"""
+SalesQL enrichment shared by POST /salesql/enrich/{search_id} and the inline
+search -> enrich pipeline (agent/pipeline.py).
+
+    async with Enricher(summary) as enricher:
+        await enricher.enrich(search_id, [{"id": 12, "link": url, "slug": slug}, ...])
+
+Candidates with a fresh entry in the global enrichment store are copied from
+it; misses are bought from SalesQL once per canonical profile URL per Enricher
+(concurrent callers asking for the same profile share one call). Rows and store
+entries are upserted in batches by BatchWriters that are flushed on exit.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from db.batch_writer import BatchWriter
+from db.salesql_results import (
+    build_salesql_row,
+    get_cached_people,
+    save_salesql_people,
+    store_cached_people,
+)
+from services.providers import CircuitOpenError
+from services.salesql_client import (
+    SalesQLError,
+    canonical_linkedin_url,
+    enrich_person_by_linkedin_url,
+)
+
+# How many SalesQL calls may be in flight per Enricher. The requests/second quota
+# (SALESQL_RPS / SALESQL_BURST) is enforced for all workers by services/providers.py.
+SALESQL_CONCURRENCY = int(os.getenv("SALESQL_CONCURRENCY", "8"))
+
+# Enriched rows are upserted in batches of this size, or after this many seconds
+SALESQL_WRITE_BATCH = int(os.getenv("SALESQL_WRITE_BATCH", "100"))
+SALESQL_WRITE_MAX_DELAY = float(os.getenv("SALESQL_WRITE_MAX_DELAY", "1.0"))
+
+# Global enrichment store: payloads younger than this are reused by any search
+SALESQL_CACHE_TTL_SECONDS = int(os.getenv("SALESQL_CACHE_TTL_SECONDS", str(90 * 24 * 3600)))
+SALESQL_NOT_FOUND_TTL_SECONDS = int(os.getenv("SALESQL_NOT_FOUND_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+def new_summary(**extra: Any) -> Dict[str, Any]:
+    return {
+        **extra,
+        "enriched": 0,
+        "not_found": 0,
+        "failed": 0,
+        "from_cache": 0,
+        "failures": [],
+    }
+
+
+class Enricher:
+    """Counts outcomes into `summary` (see new_summary); enrich() never raises."""
+
+    def __init__(self, summary: Optional[Dict[str, Any]] = None, concurrency: Optional[int] = None) -> None:
+        self.summary = summary if summary is not None else new_summary()
+        self._sem = asyncio.Semaphore(max(1, concurrency or SALESQL_CONCURRENCY))
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.first_enriched_at: Optional[float] = None
+        self.writer = BatchWriter(
+            save_salesql_people,
+            max_batch=SALESQL_WRITE_BATCH,
+            max_delay=SALESQL_WRITE_MAX_DELAY,
+            on_error=self._on_write_error,
+        )
+        self.cache_writer = BatchWriter(
+            store_cached_people,
+            max_batch=SALESQL_WRITE_BATCH,
+            max_delay=SALESQL_WRITE_MAX_DELAY,
+        )
+
+    async def __aenter__(self) -> "Enricher":
+        self.writer.start()
+        self.cache_writer.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.writer.close()
+        await self.cache_writer.close()
+
+    def _on_write_error(self, batch: Sequence[tuple], exc: BaseException) -> None:
+        # Rows were counted as enriched when queued; move them to failed
+        self.summary["enriched"] -= len(batch)
+        self.summary["failed"] += len(batch)
+        for row in batch:
+            self.summary["failures"].append({"linkedin_url": row[2], "error": f"DB write failed: {exc}"})
+
+    def _fail(self, group: List[Dict[str, Any]], error: str) -> None:
+        self.summary["failed"] += len(group)
+        self.summary["failures"].extend({"linkedin_url": r["link"], "error": error} for r in group)
+
+    async def _write(self, search_id: int, r: Dict[str, Any], payload: Dict[str, Any]) -> None:
+        await self.writer.add(build_salesql_row(search_id, r.get("id"), r["link"], payload))
+        self.summary["enriched"] += 1
+        if self.first_enriched_at is None:
+            self.first_enriched_at = time.monotonic()
+
+    async def _fetch(self, canonical_url: str, url: str) -> Dict[str, Any]:
+        """One SalesQL call per canonical URL; later callers await the first."""
+        call = self._calls.get(canonical_url)
+        if call is None:
+            call = self._calls[canonical_url] = asyncio.ensure_future(self._buy(canonical_url, url))
+        return await asyncio.shield(call)
+
+    async def _buy(self, canonical_url: str, url: str) -> Dict[str, Any]:
+        try:
+            async with self._sem:
+                payload = await enrich_person_by_linkedin_url(url)
+        except BaseException:
+            # Let a later candidate try again instead of replaying the error
+            self._calls.pop(canonical_url, None)
+            raise
+        await self.cache_writer.add((canonical_url, payload))
+        return payload
+
+    async def _enrich_group(self, search_id: int, canonical_url: str, group: List[Dict[str, Any]]) -> None:
+        # Every row in `group` is the same person; buy the profile once
+        try:
+            payload = await self._fetch(canonical_url, group[0]["link"])
+            if payload.get("_not_found"):
+                self.summary["not_found"] += len(group)
+                return
+            for r in group:
+                await self._write(search_id, r, payload)
+        except (SalesQLError, CircuitOpenError) as e:
+            self._fail(group, str(e))
+        except Exception as e:
+            self._fail(group, f"Unexpected: {e}")
+
+    async def enrich(self, search_id: int, candidates: List[Dict[str, Any]]) -> None:
+        """Enrich `candidates` ({"id", "link"}) into salesql_enriched_people for search_id."""
+        if not candidates:
+            return
+        canonical = [(r, canonical_linkedin_url(r["link"])) for r in candidates]
+        try:
+            cached = await get_cached_people(
+                [c for _, c in canonical], SALESQL_CACHE_TTL_SECONDS, SALESQL_NOT_FOUND_TTL_SECONDS
+            )
+        except Exception as e:
+            print(f"[SalesQL] Enrichment cache lookup failed, calling SalesQL for all: {e}")
+            cached = {}
+
+        misses: Dict[str, List[Dict[str, Any]]] = {}
+        for r, canonical_url in canonical:
+            payload = cached.get(canonical_url)
+            if payload is None:
+                misses.setdefault(canonical_url, []).append(r)
+                continue
+            self.summary["from_cache"] += 1
+            if payload.get("_not_found"):
+                self.summary["not_found"] += 1
+                continue
+            await self._write(search_id, r, payload)
+
+        await asyncio.gather(*(self._enrich_group(search_id, c, group) for c, group in misses.items()))
@@ -0,0 +1,101 @@
+# services/http_clients.py
+"""
+One long-lived httpx.AsyncClient per external provider.
+
+The app (main.py lifespan) and worker_runner call init_http_clients() at startup
+and close_http_clients() at shutdown. Tools call get_http_client("<provider>").
+Tests can swap in their own client with set_http_client(), e.g. one pointed at a
+local stand-in server; <PROVIDER>_BASE_URL in the environment does the same.
+"""
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:  # HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+    import h2  # noqa: F401
+    _H2_AVAILABLE = True
+except ImportError:
+    _H2_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class ProviderHTTPConfig:
+    base_url: str
+    timeout: float
+    connect_timeout: float
+    max_connections: int
+    max_keepalive: int
+    keepalive_expiry: float
+    http2: bool
+
+
+def _provider_config(name: str, default_base_url: str, default_timeout: float) -> ProviderHTTPConfig:
+    prefix = name.upper()
+    return ProviderHTTPConfig(
+        base_url=os.getenv(f"{prefix}_BASE_URL", default_base_url),
+        timeout=float(os.getenv(f"{prefix}_HTTP_TIMEOUT", str(default_timeout))),
+        connect_timeout=float(os.getenv(f"{prefix}_HTTP_CONNECT_TIMEOUT", "5")),
+        max_connections=int(os.getenv(f"{prefix}_HTTP_MAX_CONNECTIONS", "20")),
+        max_keepalive=int(os.getenv(f"{prefix}_HTTP_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(os.getenv(f"{prefix}_HTTP_KEEPALIVE_EXPIRY", "30")),
+        http2=os.getenv(f"{prefix}_HTTP2", os.getenv("HTTP2_ENABLED", "0")) == "1",
+    )
+
+
+PROVIDERS: Dict[str, ProviderHTTPConfig] = {
+    "serper": _provider_config("serper", "https://google.serper.dev", 20),
+    "salesql": _provider_config("salesql", "https://api-public.salesql.com/v1", 30),
+    "google_cse": _provider_config("google_cse", "https://www.googleapis.com", 20),
+}
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def _build_client(cfg: ProviderHTTPConfig) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=cfg.base_url,
+        timeout=httpx.Timeout(cfg.timeout, connect=cfg.connect_timeout),
+        limits=httpx.Limits(
+            max_connections=cfg.max_connections,
+            max_keepalive_connections=cfg.max_keepalive,
+            keepalive_expiry=cfg.keepalive_expiry,
+        ),
+        http2=cfg.http2 and _H2_AVAILABLE,
+    )
+
+
+def init_http_clients() -> None:
+    """Create any provider clients that are not already set (idempotent)."""
+    for name, cfg in PROVIDERS.items():
+        client = _clients.get(name)
+        if client is None or client.is_closed:
+            _clients[name] = _build_client(cfg)
+
+
+async def close_http_clients() -> None:
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """Shared client for `name`; created lazily for scripts that skip init_http_clients()."""
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        if name not in PROVIDERS:
+            raise KeyError(f"Unknown HTTP provider: {name}")
+        client = _clients[name] = _build_client(PROVIDERS[name])
+    return client
+
+
+def set_http_client(name: str, client: Optional[httpx.AsyncClient]) -> None:
+    """Inject (or with None, drop) the client used for `name`. Caller owns its lifetime."""
+    if client is None:
+        _clients.pop(name, None)
+    else:
+        _clients[name] = client
@@ -0,0 +1,96 @@
+# services/llm_client.py
+import asyncio
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+
+from services.cache import PersistentCache, make_key
+from services.providers import call_provider
+
+load_dotenv()
+
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
+# Per-attempt request timeout, and the hard ceiling for a call including retries.
+# Retries happen in services/providers.py (OPENAI_MAX_RETRIES), not in the SDK.
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+OPENAI_TOTAL_TIMEOUT = float(
+    os.getenv("OPENAI_TOTAL_TIMEOUT", str(OPENAI_TIMEOUT * (OPENAI_MAX_RETRIES + 1)))
+)
+
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "1024"))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+
+# Parsed LLM results (not raw completions), so only good outputs get cached
+llm_cache = PersistentCache("llm", ttl=LLM_CACHE_TTL_SECONDS, maxsize=LLM_CACHE_MEMORY_SIZE)
+
+_client: Optional[AsyncOpenAI] = None
+_WS = re.compile(r"\s+")
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Shared async client (created on first use so imports never need the key)."""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            timeout=OPENAI_TIMEOUT,
+            max_retries=0,
+        )
+    return _client
+
+
+async def close_openai_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+async def chat_completion(
+    messages: List[Dict[str, Any]],
+    model: Optional[str] = None,
+    temperature: float = 0,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    Run one chat completion without blocking the event loop and return the
+    message content ("" if empty). The provider layer paces calls and retries
+    429s/transient errors with backoff; `timeout` (default OPENAI_TOTAL_TIMEOUT)
+    caps the whole call, and cancelling the awaiting task cancels the HTTP request.
+    """
+    resp = await asyncio.wait_for(
+        call_provider(
+            "openai",
+            lambda: get_openai_client().chat.completions.create(
+                model=model or OPENAI_MODEL,
+                temperature=temperature,
+                messages=messages,
+            ),
+        ),
+        timeout=OPENAI_TOTAL_TIMEOUT if timeout is None else timeout,
+    )
+    return resp.choices[0].message.content or ""
+
+
+def normalize_llm_input(text: str) -> str:
+    """'  Senior  Python devs in INDIA ' -> 'senior python devs in india'"""
+    return _WS.sub(" ", (text or "").strip().lower())
+
+
+def llm_cache_key(model: str, system_prompt: str, user_input: str) -> str:
+    """Content address of one LLM task: model + prompt + normalized input."""
+    return make_key(model, system_prompt, normalize_llm_input(user_input))
+
+
+async def get_cached_llm_result(key: str) -> Any:
+    return await llm_cache.get(key) if LLM_CACHE_ENABLED else None
+
+
+async def set_cached_llm_result(key: str, value: Any) -> None:
+    if LLM_CACHE_ENABLED:
+        await llm_cache.set(key, value)
@@ -0,0 +1,371 @@
+# services/providers.py
+"""
+One call path for every external provider (serper, salesql, google_cse, openai):
+
+    result = await call_provider("serper", lambda: client.post(...))
+
+Each provider gets
+  - a rate limit that halves on 429 and creeps back up on success (AIMD),
+    shared by all processes through the `provider_quota` table (GCRA: one row
+    per provider holds the next free slot, reserved with a single upsert)
+  - retries with exponential backoff + full jitter, honouring Retry-After
+  - a circuit breaker that fails fast with CircuitOpenError after repeated
+    5xx/transport failures and lets one probe through after a cool-down
+
+Settings per provider, e.g. SERPER_RPS, SERPER_BURST, SERPER_MAX_RETRIES,
+SERPER_BACKOFF_BASE, SERPER_BACKOFF_MAX, SERPER_CIRCUIT_FAILURES,
+SERPER_CIRCUIT_RESET. PROVIDER_LIMIT_BACKEND=local keeps limits per process.
+"""
+import asyncio
+import email.utils
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+from dotenv import load_dotenv
+
+from db.async_mysql import acquire
+from services.rate_limiter import TokenBucket
+
+load_dotenv()
+
+T = TypeVar("T")
+
+# "mysql" (rate shared through provider_quota) or "local" (per-process bucket only)
+PROVIDER_LIMIT_BACKEND = os.getenv("PROVIDER_LIMIT_BACKEND", os.getenv("CACHE_BACKEND", "mysql"))
+
+# After a provider_quota error, pace locally for this long before trying the DB again
+SHARED_LIMIT_RETRY_SECONDS = float(os.getenv("PROVIDER_SHARED_LIMIT_RETRY", "30"))
+
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """
+    The provider failed repeatedly; calls are shed until `retry_in` seconds pass.
+    `attempted` is True when Provider.call had already sent requests (that failed)
+    before the circuit opened under it, False when nothing was sent.
+    """
+
+    def __init__(self, provider: str, retry_in: float) -> None:
+        super().__init__(f"{provider} circuit open, retry in {retry_in:.1f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+        self.attempted = False
+
+
+@dataclass(frozen=True)
+class ProviderPolicy:
+    rps: float
+    burst: float
+    min_rps: float
+    max_retries: int
+    backoff_base: float
+    backoff_max: float
+    circuit_failures: int
+    circuit_reset: float
+
+
+def _policy(name: str, rps: float, max_retries: int = 3) -> ProviderPolicy:
+    prefix = name.upper()
+    rps = float(os.getenv(f"{prefix}_RPS", str(rps)))
+    return ProviderPolicy(
+        rps=rps,
+        burst=float(os.getenv(f"{prefix}_BURST", str(max(1.0, rps)))),
+        min_rps=float(os.getenv(f"{prefix}_MIN_RPS", str(min(rps, 0.2)))),
+        max_retries=int(os.getenv(f"{prefix}_MAX_RETRIES", str(max_retries))),
+        backoff_base=float(os.getenv(f"{prefix}_BACKOFF_BASE", "0.5")),
+        backoff_max=float(os.getenv(f"{prefix}_BACKOFF_MAX", "30")),
+        circuit_failures=int(os.getenv(f"{prefix}_CIRCUIT_FAILURES", "5")),
+        circuit_reset=float(os.getenv(f"{prefix}_CIRCUIT_RESET", "30")),
+    )
+
+
+POLICIES: Dict[str, ProviderPolicy] = {
+    "serper": _policy("serper", 5),
+    "salesql": _policy("salesql", 4),
+    "google_cse": _policy("google_cse", 5),
+    "openai": _policy("openai", 3, max_retries=2),
+}
+
+
+class CircuitBreaker:
+    """
+    closed -> (N consecutive failures) -> open -> (reset timeout) -> half-open:
+    one probe call; success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.retry_in() == 0 else "open"
+
+    def retry_in(self) -> float:
+        """Seconds until calls are allowed again (0 when closed or ready to probe)."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def before_call(self, provider: str) -> bool:
+        """Raises CircuitOpenError while open; returns True if this caller is the half-open probe."""
+        if self.opened_at is None:
+            return False
+        wait = self.retry_in()
+        if wait > 0 or self._probing:
+            raise CircuitOpenError(provider, wait or self.reset_timeout)
+        self._probing = True  # half-open: this caller is the probe
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        """The probe ended without telling us anything (e.g. a 4xx)."""
+        self._probing = False
+
+
+class AdaptiveRateLimiter:
+    """
+    Paces calls at `rate` per second. A 429 halves the rate (down to min_rps)
+    and pauses until Retry-After; each success adds back a small step (up to
+    the configured rps). With the mysql backend the pacing happens on the
+    shared provider_quota row, so every worker process draws from one quota.
+    """
+
+    def __init__(self, provider: str, policy: ProviderPolicy, backend: Optional[str] = None) -> None:
+        self.provider = provider
+        self.max_rate = policy.rps
+        self.min_rate = min(policy.min_rps, policy.rps)
+        self.burst = policy.burst
+        self.rate = policy.rps
+        self.backend = backend or PROVIDER_LIMIT_BACKEND
+        self._bucket = TokenBucket(rate=self.rate, capacity=self.burst)
+        self._paused_until = 0.0
+        self._shared_retry_at = 0.0
+        self.stats = {"calls": 0, "throttled": 0, "waited_s": 0.0, "db_errors": 0}
+
+    def _set_rate(self, rate: float) -> None:
+        self.rate = max(self.min_rate, min(self.max_rate, rate))
+        self._bucket.set_rate(self.rate)
+
+    def on_success(self) -> None:
+        if self.rate < self.max_rate:
+            # Additive increase: one halving is undone by ~10 clean calls
+            self._set_rate(self.rate + self.max_rate / 20)
+
+    async def on_throttled(self, retry_after: Optional[float]) -> None:
+        self.stats["throttled"] += 1
+        self._set_rate(self.rate / 2)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            if self.backend == "mysql":
+                await self._push_shared_slot(retry_after)
+
+    async def acquire(self) -> None:
+        started = time.monotonic()
+        pause = self._paused_until - started
+        if pause > 0:
+            await asyncio.sleep(pause)
+        if self.backend == "mysql" and time.monotonic() >= self._shared_retry_at:
+            try:
+                wait = await self._reserve_shared_slot()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            except Exception as e:
+                self.stats["db_errors"] += 1
+                self._shared_retry_at = time.monotonic() + SHARED_LIMIT_RETRY_SECONDS
+                print(f"[Providers:{self.provider}] shared limit unavailable, pacing locally: {e}")
+                await self._bucket.acquire()
+        else:
+            await self._bucket.acquire()
+        self.stats["calls"] += 1
+        self.stats["waited_s"] += time.monotonic() - started
+
+    async def _reserve_shared_slot(self) -> float:
+        """
+        GCRA on one row: take the slot at max(next_slot, now - burst allowance)
+        and move next_slot one interval further. LAST_INSERT_ID(expr) hands the
+        new value back on this connection without a second locking read.
+        Returns how long to sleep before the reserved slot starts.
+        """
+        interval_us = int(1_000_000 / self.rate)
+        allowance_us = int(max(0.0, self.burst - 1) * interval_us)
+        async with acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    INSERT INTO provider_quota (provider, next_slot_us)
+                    VALUES (%s, LAST_INSERT_ID(FLOOR(UNIX_TIMESTAMP(NOW(6)) * 1000000) + %s))
+                    ON DUPLICATE KEY UPDATE next_slot_us = LAST_INSERT_ID(
+                      GREATEST(next_slot_us, FLOOR(UNIX_TIMESTAMP(NOW(6)) * 1000000) - %s) + %s
+                    )
+                    """,
+                    (self.provider, interval_us, allowance_us, interval_us),
+                )
+                await cur.execute("SELECT LAST_INSERT_ID(), FLOOR(UNIX_TIMESTAMP(NOW(6)) * 1000000)")
+                next_slot_us, now_us = await cur.fetchone()
+        return max(0.0, (int(next_slot_us) - interval_us - int(now_us)) / 1_000_000)
+
+    async def _push_shared_slot(self, delay: float) -> None:
+        """Retry-After applies to everyone: nobody gets a slot before it ends."""
+        try:
+            async with acquire() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(
+                        """
+                        UPDATE provider_quota
+                        SET next_slot_us = GREATEST(next_slot_us, FLOOR(UNIX_TIMESTAMP(NOW(6)) * 1000000) + %s)
+                        WHERE provider = %s
+                        """,
+                        (int(delay * 1_000_000), self.provider),
+                    )
+        except Exception as e:
+            self.stats["db_errors"] += 1
+            print(f"[Providers:{self.provider}] could not share Retry-After: {e}")
+
+
+class Provider:
+    def __init__(self, name: str, policy: ProviderPolicy) -> None:
+        self.name = name
+        self.policy = policy
+        self.limiter = AdaptiveRateLimiter(name, policy)
+        self.breaker = CircuitBreaker(policy.circuit_failures, policy.circuit_reset)
+        self.stats = {"ok": 0, "retries": 0, "failed": 0, "shed": 0}
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter; a server-given Retry-After is a floor, not a suggestion
+        delay = random.uniform(0, min(self.policy.backoff_max, self.policy.backoff_base * (2 ** attempt)))
+        return max(delay, retry_after or 0.0)
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            try:
+                probe = self.breaker.before_call(self.name)
+            except CircuitOpenError as e:
+                self.stats["shed"] += 1
+                e.attempted = attempt > 0  # opened between our retries
+                raise
+            try:
+                await self.limiter.acquire()
+            except BaseException:
+                if probe:
+                    self.breaker.release()
+                raise
+            try:
+                result = await fn()
+            except Exception as e:
+                status, retry_after = _classify(e)
+                transient = status is None and _is_transient(e)
+                if status == 429:
+                    await self.limiter.on_throttled(retry_after)
+                    if probe:
+                        self.breaker.release()
+                elif transient or (status is not None and status >= 500):
+                    self.breaker.record_failure()
+                elif probe:
+                    self.breaker.release()
+                retryable = transient or status in RETRYABLE_STATUS
+                if not retryable or attempt >= self.policy.max_retries:
+                    self.stats["failed"] += 1
+                    raise
+                self.stats["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled (e.g. by a wait_for timeout): a probe that never finished
+                # must not leave the circuit stuck half-open
+                if probe:
+                    self.breaker.release()
+                raise
+            self.breaker.record_success()
+            self.limiter.on_success()
+            self.stats["ok"] += 1
+            return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "rate": round(self.limiter.rate, 3),
+            "limiter": dict(self.limiter.stats, waited_s=round(self.limiter.stats["waited_s"], 3)),
+            "circuit": self.breaker.state,
+        }
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _classify(exc: BaseException) -> "tuple[Optional[int], Optional[float]]":
+    """(HTTP status or None, Retry-After seconds or None) for an exception from any provider SDK."""
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is None and response is not None:
+        headers = getattr(response, "headers", None) or {}
+        retry_after = _retry_after_seconds(headers.get("retry-after"))
+    return status, retry_after
+
+
+def _is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (httpx.TransportError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    # openai.APIConnectionError / APITimeoutError carry no status code
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+_providers: Dict[str, Provider] = {}
+
+
+def get_provider(name: str) -> Provider:
+    provider = _providers.get(name)
+    if provider is None:
+        provider = _providers[name] = Provider(name, POLICIES.get(name) or _policy(name, 5))
+    return provider
+
+
+async def call_provider(name: str, fn: Callable[[], Awaitable[T]]) -> T:
+    """Run `fn` (one provider request) under that provider's limit, retries and breaker."""
+    return await get_provider(name).call(fn)
+
+
+def circuit_retry_in(name: str) -> float:
+    """Seconds until `name` accepts calls again (0 if its circuit is not open)."""
+    return get_provider(name).breaker.retry_in()
+
+
+def provider_stats() -> Dict[str, Any]:
+    return {name: provider.snapshot() for name, provider in _providers.items()}
@@ -0,0 +1,44 @@
+# services/rate_limiter.py
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens/second refill, bursts up to `capacity`.
+
+        bucket = TokenBucket(rate=5, capacity=5)
+        await bucket.acquire()   # waits until a token is available
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate in place (tokens already earned are kept)."""
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self._refill()
+        self.rate = float(rate)
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        # The lock makes waiters queue up FIFO instead of racing for each refill
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
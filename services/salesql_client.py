@@ -1,9 +1,13 @@
 # services/salesql_client.py
 import os
+import re
 from typing import Any, Dict, Optional
-import httpx
+from urllib.parse import unquote
 from dotenv import load_dotenv
 
+from services.http_clients import get_http_client
+from services.providers import call_provider
+
 load_dotenv()
 
 # Try a few common env var names; prefer SALESQL_API_KEY
@@ -13,11 +17,13 @@ SALESQL_API_KEY = (
     or os.getenv("SALESQL_KEY")
 )
 
-API_BASE = "https://api-public.salesql.com/v1"
-
 
 class SalesQLError(Exception):
-    pass
+    def __init__(self, message: str, status_code: Optional[int] = None, response: Any = None) -> None:
+        super().__init__(message)
+        # Read by services/providers to decide on retries and Retry-After
+        self.status_code = status_code
+        self.response = response
 
 
 def _auth_headers() -> Dict[str, str]:
@@ -41,26 +47,60 @@ def _normalize_url(linkedin_url: str) -> str:
     return url
 
 
+_PROFILE_PATH = re.compile(r"linkedin\.com/in/([^/?#]+)", re.IGNORECASE)
+
+
+def linkedin_slug(linkedin_url: Optional[str]) -> Optional[str]:
+    """
+    Profile slug shared by every URL variant, or None for non-profile URLs:
+      https://in.linkedin.com/in/John-Doe-123/en?trk=x -> john-doe-123
+    Stored in google_search_results.linkedin_slug / salesql_enriched_people.linkedin_slug.
+    """
+    m = _PROFILE_PATH.search(_normalize_url(linkedin_url or ""))
+    if not m:
+        return None
+    return unquote(m.group(1)).strip().lower() or None
+
+
+def profile_url(slug: str) -> str:
+    return f"https://www.linkedin.com/in/{slug}"
+
+
+def canonical_linkedin_url(linkedin_url: str) -> str:
+    """
+    One URL per profile, whatever variant Google returned:
+      https://in.linkedin.com/in/John-Doe-123/en?trk=x -> https://www.linkedin.com/in/john-doe-123
+    Non-profile URLs come back normalized and lower-cased.
+    """
+    slug = linkedin_slug(linkedin_url)
+    if slug is None:
+        return _normalize_url(linkedin_url).lower()
+    return profile_url(slug)
+
+
 async def enrich_person_by_linkedin_url(linkedin_url: str) -> Dict[str, Any]:
     """Call SalesQL 'persons/enrich' by LinkedIn URL.
     Returns parsed JSON on 200, a dict with _not_found=True on 404,
-    otherwise raises SalesQLError.
+    otherwise raises SalesQLError (or CircuitOpenError while SalesQL is down).
     """
-    url = f"{API_BASE}/persons/enrich/"
     params = {"linkedin_url": _normalize_url(linkedin_url)}
     headers = _auth_headers()
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.get(url, params=params, headers=headers)
-        if resp.status_code == 200:
-            return resp.json()
-        if resp.status_code == 404:
-            # Not found is a valid outcome
-            return {"_not_found": True, "_status_code": 404, "_message": "No person found"}
+    async def _get():
+        resp = await get_http_client("salesql").get("/persons/enrich/", params=params, headers=headers)
+        if resp.status_code in (200, 404):
+            return resp
 
         # Try to extract error payload
         try:
             payload = resp.json()
         except Exception:
             payload = {"text": resp.text}
-        raise SalesQLError(f"SalesQL error {resp.status_code}: {payload}")
+        raise SalesQLError(f"SalesQL error {resp.status_code}: {payload}", resp.status_code, resp)
+
+    # Rate-limited across workers, 429/5xx retried (services/providers.py)
+    resp = await call_provider("salesql", _get)
+    if resp.status_code == 404:
+        # Not found is a valid outcome
+        return {"_not_found": True, "_status_code": 404, "_message": "No person found"}
+    return resp.json()
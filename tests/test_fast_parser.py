@@ -0,0 +1,32 @@
+import pytest
+
+from agent.fast_parser import REGION_EXPANSIONS, fast_parse
+
+US_CITIES = REGION_EXPANSIONS["United States"]
+INDIA_CITIES = REGION_EXPANSIONS["India"]
+
+
+@pytest.mark.parametrize(
+    "text, tech_stack, locations, confident",
+    [
+        ("Senior Python / Django devs in India", ["Python", "Django"], INDIA_CITIES, True),
+        ("Ruby on Rails developers in Bangalore", ["Ruby on Rails"], ["Bangalore"], True),
+        ("React and Node.js engineers from Pune or Hyderabad", ["React", "Node.js"], ["Pune", "Hyderabad"], True),
+        ("Find Rails developers in US", ["Ruby on Rails"], US_CITIES, True),
+        ("Java developers in the U.S.", ["Java"], US_CITIES, True),
+        ("Golang engineers with at least 5 years in NYC", ["Go"], ["New York"], True),
+        ("Python developers", ["Python"], [], True),
+        # Places we can't expand locally must go to the LLM, not the default locations
+        ("Find Rails developers in us", ["Ruby on Rails"], [], False),
+        ("Remote Rails developers", ["Ruby on Rails"], [], False),
+        ("Python Django Flask FastAPI developers in Lagos", ["Python", "Django", "Flask", "FastAPI"], [], False),
+        # No technology at all
+        ("Find me some people in Bangalore", [], ["Bangalore"], False),
+        ("", [], [], False),
+    ],
+)
+def test_fast_parse(text, tech_stack, locations, confident):
+    parsed, confidence = fast_parse(text)
+    assert parsed["tech_stack"] == tech_stack
+    assert parsed["locations"] == locations
+    assert (confidence >= 0.8) is confident
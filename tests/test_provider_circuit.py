@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from agent.workers import linkedin_search_worker as worker
+from services.providers import (
+    AdaptiveRateLimiter,
+    CircuitOpenError,
+    Provider,
+    ProviderPolicy,
+)
+
+POLICY = ProviderPolicy(
+    rps=1000, burst=1000, min_rps=1000, max_retries=5,
+    backoff_base=0, backoff_max=0, circuit_failures=2, circuit_reset=60,
+)
+
+
+class ServerError(Exception):
+    status_code = 500
+
+
+def _provider() -> Provider:
+    provider = Provider("stub", POLICY)
+    provider.limiter = AdaptiveRateLimiter("stub", POLICY, backend="memory")
+    return provider
+
+
+def _failing(calls: list):
+    async def fn():
+        calls.append(1)
+        raise ServerError("HTTP 500")
+    return fn
+
+
+def test_circuit_opening_mid_retries_counts_as_attempted():
+    provider, calls = _provider(), []
+    with pytest.raises(CircuitOpenError) as exc:
+        asyncio.run(provider.call(_failing(calls)))
+    assert len(calls) == 2
+    assert exc.value.attempted
+
+
+def test_call_shed_before_any_request_is_not_attempted():
+    provider, calls = _provider(), []
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(provider.call(_failing(calls)))
+    with pytest.raises(CircuitOpenError) as exc:
+        asyncio.run(provider.call(_failing(calls)))
+    assert len(calls) == 2
+    assert not exc.value.attempted
+
+
+def test_non_probe_4xx_keeps_half_open_probe():
+    provider = _provider()
+    provider.breaker.opened_at = 0.0  # reset timeout long past: half-open
+    provider.breaker.before_call("stub")  # someone else is the probe
+
+    class NotFound(Exception):
+        status_code = 404
+
+    async def fn():
+        raise NotFound("HTTP 404")
+
+    provider.breaker.opened_at = None  # this call started while the circuit was closed
+    with pytest.raises(NotFound):
+        asyncio.run(provider.call(fn))
+    assert provider.breaker._probing
+
+
+@pytest.mark.parametrize(
+    "attempted, released, failed",
+    [(False, 1, 0), (True, 0, 1)],
+)
+def test_worker_spends_an_attempt_only_once_a_request_was_sent(monkeypatch, attempted, released, failed):
+    seen = {"released": 0, "failed": 0}
+
+    async def release_query(*args, **kwargs):
+        seen["released"] += 1
+        return True
+
+    async def mark_query_failed(*args, **kwargs):
+        seen["failed"] += 1
+        return True
+
+    monkeypatch.setattr(worker, "release_query", release_query)
+    monkeypatch.setattr(worker, "mark_query_failed", mark_query_failed)
+
+    error = CircuitOpenError("serper", 30)
+    error.attempted = attempted
+    row = {"id": 7, "query": "q", "worker_id": "w", "attempts": 1}
+    entry = asyncio.run(worker._finish_row(row, error))
+
+    assert "error" in entry
+    assert seen == {"released": released, "failed": failed}
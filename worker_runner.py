@@ -2,27 +2,79 @@
 # Simple background worker loop for Agent Vikram
 import asyncio
 import os
-import time
+import signal
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # Import the async worker that processes pending queries
-from agent.workers.linkedin_search_worker import run_linkedin_search_worker
+from agent.workers.linkedin_search_worker import (
+    run_linkedin_search_worker,
+    run_continuous_search_worker,
+)
+from agent.tools.query_queue import reap_expired_leases, default_worker_id
+from db.async_mysql import init_pool, close_pool
+from db.batch_writer import close_all_writers
+from services.http_clients import init_http_clients, close_http_clients
 
 INTERVAL_SECONDS = int(os.getenv("WORKER_POLL_INTERVAL", "20"))
 MAX_RESULTS_PER_QUERY = int(os.getenv("WORKER_MAX_RESULTS_PER_QUERY", "20"))
+# "continuous": keep WORKER_CONCURRENCY searches in flight, back off only when idle
+# "poll": legacy batch of 5 every WORKER_POLL_INTERVAL seconds
+WORKER_MODE = os.getenv("WORKER_MODE", "continuous")
 
-async def main():
-    while True:
+def _install_stop_handlers(stop_event: asyncio.Event) -> None:
+    """SIGTERM/SIGINT: stop claiming new rows and let in-flight ones finish."""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
         try:
-            result = await run_linkedin_search_worker(max_results_per_query=MAX_RESULTS_PER_QUERY)
-            # Basic visibility in logs
-            print({"worker_run": result})
-        except Exception as e:
-            # Never crash the worker loop
-            print({"worker_error": str(e)})
-        await asyncio.sleep(INTERVAL_SECONDS)
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # e.g. Windows, or not in the main thread
 
-if __name__ == "__main__":
+async def main(stop_event: Optional[asyncio.Event] = None):
+    stop_event = stop_event or asyncio.Event()
+    _install_stop_handlers(stop_event)
+    await init_pool()
+    init_http_clients()
+    try:
+        worker_id = default_worker_id()
+        if WORKER_MODE == "continuous":
+            totals = await run_continuous_search_worker(
+                max_results_per_query=MAX_RESULTS_PER_QUERY,
+                worker_id=worker_id,
+                stop_event=stop_event,
+            )
+            print({"worker_stopped": worker_id, "totals": totals}, flush=True)
+            return
+        while not stop_event.is_set():
+            try:
+                # Hand back rows whose worker died mid-lease
+                reaped = await reap_expired_leases()
+                if reaped:
+                    print({"worker_reaped": reaped})
+                result = await run_linkedin_search_worker(
+                    max_results_per_query=MAX_RESULTS_PER_QUERY,
+                    worker_id=worker_id,
+                )
+                # Basic visibility in logs
+                print({"worker_run": result})
+            except Exception as e:
+                # Never crash the worker loop
+                print({"worker_error": str(e)})
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await close_all_writers()
+        await close_http_clients()
+        await close_pool()
+
+def run() -> None:
+    """Process entry point (also used by worker_supervisor for each child)."""
     asyncio.run(main())
+
+if __name__ == "__main__":
+    run()
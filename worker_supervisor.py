@@ -0,0 +1,110 @@
+# worker_supervisor.py
+# Runs N worker_runner processes (one event loop + DB pool each) and keeps them alive.
+#
+#   WORKER_PROCESSES=8 python worker_supervisor.py
+#
+# SIGTERM/SIGINT is forwarded to the children, which stop claiming new rows and
+# finish the ones they hold; children still running after
+# WORKER_SHUTDOWN_TIMEOUT seconds are killed (their leases expire and the reaper
+# hands the rows to another worker).
+import multiprocessing as mp
+import os
+import signal
+import time
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", str(os.cpu_count() or 1)))
+SHUTDOWN_TIMEOUT = float(os.getenv("WORKER_SHUTDOWN_TIMEOUT", "120"))
+RESTART_BACKOFF_MAX = float(os.getenv("WORKER_RESTART_BACKOFF_MAX", "60"))
+# A child that lived at least this long resets its restart backoff
+STABLE_AFTER_SECONDS = 30.0
+
+
+def _child_main() -> None:
+    # Imported here so each spawned child builds its own clients, pool and loop
+    import worker_runner
+    worker_runner.run()
+
+
+class _Slot:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.process: Optional[mp.process.BaseProcess] = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restart_at = 0.0
+
+
+def main(processes: int = WORKER_PROCESSES) -> None:
+    ctx = mp.get_context("spawn")
+    slots: Dict[int, _Slot] = {i: _Slot(i) for i in range(max(1, processes))}
+    stopping = False
+
+    def _start(slot: _Slot) -> None:
+        slot.process = ctx.Process(target=_child_main, name=f"search-worker-{slot.index}")
+        slot.process.start()
+        slot.started_at = time.monotonic()
+        print({"supervisor": "started", "slot": slot.index, "pid": slot.process.pid}, flush=True)
+
+    def _on_signal(signum, frame) -> None:
+        nonlocal stopping
+        if stopping:
+            return
+        stopping = True
+        print({"supervisor": "stopping", "signal": signum}, flush=True)
+        for slot in slots.values():
+            if slot.process is not None and slot.process.is_alive():
+                slot.process.terminate()  # SIGTERM -> graceful drain in the child
+
+    signal.signal(signal.SIGTERM, _on_signal)
+    signal.signal(signal.SIGINT, _on_signal)
+
+    for slot in slots.values():
+        _start(slot)
+
+    while not stopping:
+        time.sleep(1.0)
+        now = time.monotonic()
+        for slot in slots.values():
+            proc = slot.process
+            if proc is not None and proc.is_alive():
+                continue
+            if stopping:
+                break
+            if proc is not None:
+                # Child exited without being asked to: schedule a restart with backoff
+                lived = now - slot.started_at
+                slot.failures = 0 if lived >= STABLE_AFTER_SECONDS else slot.failures + 1
+                delay = min(RESTART_BACKOFF_MAX, 2 ** slot.failures - 1)
+                slot.restart_at = now + delay
+                print({
+                    "supervisor": "child_exited",
+                    "slot": slot.index,
+                    "pid": proc.pid,
+                    "exitcode": proc.exitcode,
+                    "restart_in": delay,
+                }, flush=True)
+                proc.close()
+                slot.process = None
+            if now >= slot.restart_at:
+                _start(slot)
+
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    for slot in slots.values():
+        proc = slot.process
+        if proc is None:
+            continue
+        proc.join(max(0.0, deadline - time.monotonic()))
+        if proc.is_alive():
+            print({"supervisor": "killing", "slot": slot.index, "pid": proc.pid}, flush=True)
+            proc.kill()
+            proc.join()
+    print({"supervisor": "stopped"}, flush=True)
+
+
+if __name__ == "__main__":
+    main()